@@ -37,102 +37,146 @@ Slack 백업 파일의 URL에 토큰 추가 도구
     - Slack 파일 URL만 처리하고 다른 URL은 건드리지 않습니다
 """
 
-import json
 import argparse
+import functools
 import pathlib
 import sys
 import os
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from urllib.parse import quote
 
-def add_token_to_url(url: str, token: str) -> str:
-    """URL에 토큰 파라미터를 추가합니다."""
-    if not url or 'files.slack.com' not in url:
-        return url
+from split_messages_by_date import _dumps, _iter_files, _loads
 
-    # 이미 토큰이 있는 경우 스킵
-    if 'token=' in url:
-        return url
+# Slack 파일 URL 여부 / 이미 토큰이 붙어 있는지 확인하는 패턴
+_SLACK_RE = re.compile(r'https://files\.slack\.com/')
+_HAS_TOKEN = re.compile(r'[?&]token=')
 
-    # URL을 파싱
-    parsed = urlparse(url)
-    query_params = parse_qs(parsed.query)
+# 토큰을 붙일 파일 객체의 URL 필드들
+_URL_KEYS = ('url_private', 'url_private_download',
+             'thumb_64', 'thumb_80', 'thumb_160', 'thumb_360', 'thumb_480',
+             'thumb_720', 'thumb_800', 'thumb_960', 'thumb_1024')
 
-    # 토큰 추가
-    query_params['token'] = [token]
+def add_token_to_url(url: str, quoted_token: str) -> str:
+    """URL에 토큰 파라미터를 추가합니다.
 
-    # URL 재구성
-    new_query = urlencode(query_params, doseq=True)
-    new_parsed = parsed._replace(query=new_query)
+    URL 전체를 파싱하지 않고 쿼리스트링 끝에 token 파라미터만 이어붙입니다.
+    quoted_token은 이미 URL 인코딩된 토큰이어야 합니다.
+    """
+    if not url or _SLACK_RE.match(url) is None:
+        return url
+
+    # 이미 토큰이 있는 경우 스킵
+    if _HAS_TOKEN.search(url):
+        return url
 
-    return urlunparse(new_parsed)
+    if '?' in url:
+        return f"{url}&token={quoted_token}"
+    return f"{url}?token={quoted_token}"
 
-def process_message(message: dict, token: str) -> bool:
+def process_message(message: dict, quoted_token: str) -> bool:
     """메시지 객체의 파일 URL들에 토큰을 추가합니다. 수정되었으면 True 반환."""
     modified = False
 
-    if 'files' in message and isinstance(message['files'], list):
-        for file_obj in message['files']:
-            if isinstance(file_obj, dict):
-                # url_private 처리
-                if 'url_private' in file_obj:
-                    original_url = file_obj['url_private']
-                    new_url = add_token_to_url(original_url, token)
-                    if new_url != original_url:
-                        file_obj['url_private'] = new_url
-                        modified = True
-
-                # url_private_download 처리
-                if 'url_private_download' in file_obj:
-                    original_url = file_obj['url_private_download']
-                    new_url = add_token_to_url(original_url, token)
-                    if new_url != original_url:
-                        file_obj['url_private_download'] = new_url
-                        modified = True
-
-                # 썸네일 URL들 처리
-                thumbnail_keys = ['thumb_64', 'thumb_80', 'thumb_160', 'thumb_360',
-                                'thumb_480', 'thumb_720', 'thumb_800', 'thumb_960', 'thumb_1024']
-
-                for thumb_key in thumbnail_keys:
-                    if thumb_key in file_obj:
-                        original_url = file_obj[thumb_key]
-                        new_url = add_token_to_url(original_url, token)
-                        if new_url != original_url:
-                            file_obj[thumb_key] = new_url
-                            modified = True
+    files = message.get('files')
+    if isinstance(files, list):
+        for file_obj in files:
+            if not isinstance(file_obj, dict):
+                continue
+            for key in _URL_KEYS:
+                url = file_obj.get(key)
+                if url is None:
+                    continue
+                new_url = add_token_to_url(url, quoted_token)
+                if new_url is not url:
+                    file_obj[key] = new_url
+                    modified = True
 
     return modified
 
-def process_json_file(file_path: pathlib.Path, token: str, dry_run: bool = False) -> int:
-    """JSON 파일을 처리하여 토큰을 추가합니다. 수정된 메시지 수를 반환."""
+def _write_messages(out_path: str, messages: list, compact: bool = False):
+    """메시지 리스트를 JSON 배열로 메시지 단위로 직렬화하며 기록합니다.
+
+    전체 리스트를 한 번에 직렬화하지 않으므로 쓰기 시 메모리 사용이 메시지 하나 크기로 제한됩니다.
+    """
+    with open(out_path, 'wb') as f:
+        f.write(b'[')
+        for i, message in enumerate(messages):
+            if compact:
+                if i:
+                    f.write(b',')
+                f.write(_dumps(message, compact=True))
+            else:
+                # json.dump(indent=2)와 같은 모양이 되도록 한 단계 들여쓰기
+                f.write(b',\n  ' if i else b'\n  ')
+                f.write(_dumps(message).replace(b'\n', b'\n  '))
+        f.write(b'\n]' if messages and not compact else b']')
+
+def process_json_file(file_path: pathlib.Path, quoted_token: str, dry_run: bool = False,
+                      compact: bool = False) -> Tuple[pathlib.Path, int, Optional[str]]:
+    """JSON 파일을 처리하여 토큰을 추가합니다. quoted_token은 URL 인코딩된 토큰입니다.
+
+    수정된 내용은 원본 옆의 임시 파일(.tmp)에 기록하고
+    (경로, 수정된 메시지 수, 임시 파일 경로)를 반환합니다.
+    임시 파일은 수정된 메시지가 있고 dry_run이 아닐 때만 만들어지며,
+    원본 교체는 write_result()에서 한 곳에 모아 처리합니다.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        # Slack 파일 URL이 하나도 없으면 파싱할 필요 없음
+        if b'files.slack.com' not in raw:
+            return file_path, 0, None
+        data = _loads(raw)
     except Exception as e:
         print(f"Error reading {file_path}: {e}", file=sys.stderr)
-        return 0
+        return file_path, 0, None
 
     if not isinstance(data, list):
         print(f"Warning: {file_path} does not contain a list of messages")
-        return 0
+        return file_path, 0, None
+
+    # 첨부 파일이 있는 메시지가 하나도 없으면 메시지별 처리 생략
+    if not any('files' in m for m in data if isinstance(m, dict)):
+        return file_path, 0, None
 
     modified_count = 0
 
     for message in data:
         if isinstance(message, dict):
-            if process_message(message, token):
+            if process_message(message, quoted_token):
                 modified_count += 1
 
-    if modified_count > 0 and not dry_run:
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"Updated {file_path}: {modified_count} messages modified")
-        except Exception as e:
-            print(f"Error writing {file_path}: {e}", file=sys.stderr)
-            return 0
-    elif modified_count > 0:
+    if modified_count == 0 or dry_run:
+        return file_path, modified_count, None
+
+    tmp_path = f"{file_path}.tmp"
+    try:
+        _write_messages(tmp_path, data, compact)
+    except Exception as e:
+        print(f"Error writing {file_path}: {e}", file=sys.stderr)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return file_path, 0, None
+
+    return file_path, modified_count, tmp_path
+
+def write_result(file_path: pathlib.Path, modified_count: int, tmp_path: Optional[str]) -> int:
+    """process_json_file 결과의 임시 파일을 os.replace로 원본과 교체합니다. 반영된 메시지 수를 반환."""
+    if modified_count == 0:
+        return 0
+
+    if tmp_path is None:
         print(f"Would update {file_path}: {modified_count} messages (dry run)")
+        return modified_count
+
+    try:
+        os.replace(tmp_path, file_path)
+        print(f"Updated {file_path}: {modified_count} messages modified")
+    except Exception as e:
+        print(f"Error writing {file_path}: {e}", file=sys.stderr)
+        return 0
 
     return modified_count
 
@@ -145,6 +189,7 @@ def main():
   %(prog)s file.json --token xoxe-123...              # 단일 파일 처리
   %(prog)s backup_folder/ --token xoxe-123...         # 디렉토리 처리
   %(prog)s backup_folder/ --recursive                 # 하위 폴더 포함
+  %(prog)s backup_folder/ --compact                   # 들여쓰기 없이 저장
 
 환경변수:
   SLACK_USER_TOKEN    Slack 사용자 토큰 (xoxe-... 형태)
@@ -166,6 +211,10 @@ def main():
                        action="store_true",
                        help="디렉토리의 모든 하위 폴더까지 재귀적으로 JSON 파일 처리")
 
+    parser.add_argument("--compact",
+                       action="store_true",
+                       help="들여쓰기 없이 압축된 JSON으로 저장 (쓰기 속도 향상, 파일 크기 감소)")
+
     args = parser.parse_args()
 
     # 토큰 가져오기
@@ -184,6 +233,9 @@ def main():
     if token.startswith('Bearer '):
         token = token[7:]
 
+    # URL에 붙일 토큰은 실행 중 변하지 않으므로 한 번만 인코딩
+    quoted_token = quote(token, safe='')
+
     path = pathlib.Path(args.path)
 
     if not path.exists():
@@ -194,15 +246,13 @@ def main():
 
     if path.is_file():
         if path.suffix == '.json':
-            total_modified = process_json_file(path, token, args.dry_run)
+            total_modified = write_result(*process_json_file(path, quoted_token, args.dry_run, args.compact))
         else:
             print(f"Error: {path} is not a JSON file", file=sys.stderr)
             sys.exit(1)
     elif path.is_dir():
-        if args.recursive:
-            json_files = list(path.rglob("*.json"))
-        else:
-            json_files = list(path.glob("*.json"))
+        json_files = [pathlib.Path(p) for p in
+                      _iter_files(path, lambda n: n.endswith('.json'), args.recursive)]
 
         if not json_files:
             print(f"No JSON files found in {path}")
@@ -210,9 +260,13 @@ def main():
 
         print(f"Found {len(json_files)} JSON files to process")
 
-        for json_file in json_files:
-            modified = process_json_file(json_file, token, args.dry_run)
-            total_modified += modified
+        # 파일마다 독립적이므로 여러 프로세스로 나누어 처리 (CPU 바운드)
+        # 파일 쓰기는 메인 프로세스 한 곳에서 결과가 도착하는 대로 몰아서 처리
+        worker = functools.partial(process_json_file, quoted_token=quoted_token,
+                                   dry_run=args.dry_run, compact=args.compact)
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            for result in ex.map(worker, json_files, chunksize=8):
+                total_modified += write_result(*result)
 
     action = "Would modify" if args.dry_run else "Modified"
     print(f"\n{action} {total_modified} messages total")
@@ -4,186 +4,181 @@
 API 연결 상태, rate limit, timeout 등을 확인합니다.
 """
 import argparse
+import hashlib
+import json
 import os
+import pathlib
+import socket
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+try:
+    from requests.exceptions import Timeout as RequestsTimeout
+    _TIMEOUT_ERRORS = (socket.timeout, TimeoutError, RequestsTimeout)
+except ImportError:
+    _TIMEOUT_ERRORS = (socket.timeout, TimeoutError)
+
+
+def _is_timeout(e: Exception) -> bool:
+    """예외가 timeout인지 확인합니다 (urllib의 URLError로 감싸진 경우 포함)."""
+    return isinstance(e, _TIMEOUT_ERRORS) or isinstance(getattr(e, "reason", None), _TIMEOUT_ERRORS)
+
+
+def _extract_auth(response, fields: dict):
+    """auth.test 응답에서 사용자/팀 정보를 추출합니다."""
+    fields["user"] = response.get("user")
+    fields["team"] = response.get("team")
+    fields["user_id"] = response.get("user_id")
+    fields["team_id"] = response.get("team_id")
+
+
+def _extract_user_count(response, fields: dict):
+    """users.list 응답에서 사용자 수를 추출합니다."""
+    fields["user_count"] = len(response.get("members", []))
+
+
+def _extract_channel_count(response, fields: dict):
+    """conversations.list 응답에서 대화 수를 추출합니다."""
+    fields["channel_count"] = len(response.get("channels", []))
+
 
 class SlackStatusChecker:
     """Slack API 상태를 체크하는 클래스"""
     
-    def __init__(self, token: str, timeout: int = 30):
+    def __init__(self, token: str, timeout: int = 30, cache_seconds: int = 0):
         self.token = token
         self.timeout = timeout
+        self.cache_seconds = cache_seconds
         self.client = WebClient(token=token, timeout=timeout)
     
-    def check_auth(self) -> dict:
-        """인증 상태를 확인합니다."""
-        result = {
-            "test": "auth.test",
-            "success": False,
-            "user": None,
-            "team": None,
-            "error": None,
-            "response_time_ms": None
-        }
-        
-        start_time = time.time()
+    def _auth_cache_file(self) -> pathlib.Path:
+        """토큰별 auth.test 캐시 파일 경로를 반환합니다 (토큰 자체는 저장하지 않음)."""
+        cache_root = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        key = hashlib.sha256(self.token.encode()).hexdigest()[:16]
+        return pathlib.Path(cache_root) / "slack_status" / f"auth-{key}.json"
+    
+    def _load_cached_auth(self):
+        """TTL 이내의 캐시된 auth.test 결과가 있으면 반환합니다."""
+        cache_file = self._auth_cache_file()
         try:
-            response = self.client.auth_test()
-            elapsed = (time.time() - start_time) * 1000
-            
-            result["success"] = response["ok"]
-            result["user"] = response.get("user")
-            result["team"] = response.get("team")
-            result["user_id"] = response.get("user_id")
-            result["team_id"] = response.get("team_id")
-            result["response_time_ms"] = round(elapsed, 2)
-            
-        except SlackApiError as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["error"] = str(e)
-            result["response_time_ms"] = round(elapsed, 2)
-            if e.response:
-                result["status_code"] = e.response.status_code
-                result["error_code"] = e.response.get("error")
-        except Exception as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["error"] = f"Connection error: {str(e)}"
-            result["response_time_ms"] = round(elapsed, 2)
-            # Timeout 감지
-            if "timed out" in str(e).lower() or "timeout" in str(e).lower():
-                result["timeout"] = True
-        
+            if time.time() - cache_file.stat().st_mtime > self.cache_seconds:
+                return None
+            result = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        result["cached"] = True
         return result
     
-    def check_rate_limit(self) -> dict:
-        """Rate limit 상태를 확인합니다 (api.test 호출)."""
-        result = {
-            "test": "api.test",
-            "success": False,
-            "rate_limited": False,
-            "retry_after": None,
-            "error": None,
-            "response_time_ms": None
-        }
+    def _save_cached_auth(self, result: dict):
+        """auth.test 결과를 캐시 파일에 원자적으로 저장합니다."""
+        cache_file = self._auth_cache_file()
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".json.tmp")
+            tmp_file.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"[WARN] Failed to write auth cache {cache_file}: {e}", file=sys.stderr)
+    
+    def _run_check(self, name: str, call, fields: dict, extract=None) -> dict:
+        """API 하나를 호출하고 공통 형식의 결과 dict를 반환합니다.
         
-        start_time = time.time()
+        fields는 체크별 기본 필드이며, 성공 시 extract(response, fields)가 값을 채웁니다.
+        fields에 "rate_limited"가 있으면 429 응답을 rate limit으로 분류합니다.
+        """
+        fields = dict(fields)
+        success = False
+        error = None
+        extra = {}
+        
+        start_time = time.monotonic_ns()
         try:
-            response = self.client.api_test()
-            elapsed = (time.time() - start_time) * 1000
+            response = call()
+            elapsed = (time.monotonic_ns() - start_time) / 1e6
             
-            result["success"] = response["ok"]
-            result["response_time_ms"] = round(elapsed, 2)
+            success = response["ok"]
+            if extract:
+                extract(response, fields)
             
         except SlackApiError as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["response_time_ms"] = round(elapsed, 2)
+            elapsed = (time.monotonic_ns() - start_time) / 1e6
             
-            if e.response and e.response.status_code == 429:
-                result["rate_limited"] = True
-                result["retry_after"] = int(e.response.headers.get("Retry-After", 0))
-                result["error"] = f"Rate limited. Retry after {result['retry_after']} seconds"
+            if "rate_limited" in fields and e.response and e.response.status_code == 429:
+                fields["rate_limited"] = True
+                fields["retry_after"] = int(e.response.headers.get("Retry-After", 0))
+                error = f"Rate limited. Retry after {fields['retry_after']} seconds"
             else:
-                result["error"] = str(e)
+                error = str(e)
                 if e.response:
-                    result["status_code"] = e.response.status_code
+                    extra["status_code"] = e.response.status_code
+                    extra["error_code"] = e.response.get("error")
         except Exception as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["error"] = f"Connection error: {str(e)}"
-            result["response_time_ms"] = round(elapsed, 2)
-            if "timed out" in str(e).lower() or "timeout" in str(e).lower():
-                result["timeout"] = True
+            elapsed = (time.monotonic_ns() - start_time) / 1e6
+            error = f"Connection error: {str(e)}"
+            # Timeout 감지
+            if _is_timeout(e):
+                extra["timeout"] = True
+        
+        return {
+            "test": name,
+            "success": success,
+            **fields,
+            "error": error,
+            "response_time_ms": round(elapsed, 2),
+            **extra
+        }
+    
+    def check_auth(self) -> dict:
+        """인증 상태를 확인합니다.
         
+        cache_seconds가 0보다 크면 성공한 결과를 디스크에 캐시해 두고 TTL 동안 재사용합니다.
+        """
+        if self.cache_seconds > 0:
+            cached = self._load_cached_auth()
+            if cached is not None:
+                return cached
+        
+        result = self._run_check(
+            "auth.test",
+            self.client.auth_test,
+            {"user": None, "team": None},
+            _extract_auth
+        )
+        
+        if self.cache_seconds > 0 and result["success"]:
+            self._save_cached_auth(result)
         return result
     
+    def check_rate_limit(self) -> dict:
+        """Rate limit 상태를 확인합니다 (api.test 호출)."""
+        return self._run_check(
+            "api.test",
+            self.client.api_test,
+            {"rate_limited": False, "retry_after": None}
+        )
+    
     def check_users_list(self, limit: int = 1) -> dict:
         """users.list API 상태를 확인합니다."""
-        result = {
-            "test": "users.list",
-            "success": False,
-            "user_count": None,
-            "rate_limited": False,
-            "retry_after": None,
-            "error": None,
-            "response_time_ms": None
-        }
-        
-        start_time = time.time()
-        try:
-            response = self.client.users_list(limit=limit)
-            elapsed = (time.time() - start_time) * 1000
-            
-            result["success"] = response["ok"]
-            result["user_count"] = len(response.get("members", []))
-            result["response_time_ms"] = round(elapsed, 2)
-            
-        except SlackApiError as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["response_time_ms"] = round(elapsed, 2)
-            
-            if e.response and e.response.status_code == 429:
-                result["rate_limited"] = True
-                result["retry_after"] = int(e.response.headers.get("Retry-After", 0))
-                result["error"] = f"Rate limited. Retry after {result['retry_after']} seconds"
-            else:
-                result["error"] = str(e)
-                if e.response:
-                    result["status_code"] = e.response.status_code
-        except Exception as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["error"] = f"Connection error: {str(e)}"
-            result["response_time_ms"] = round(elapsed, 2)
-            if "timed out" in str(e).lower() or "timeout" in str(e).lower():
-                result["timeout"] = True
-        
-        return result
+        return self._run_check(
+            "users.list",
+            lambda: self.client.users_list(limit=limit),
+            {"user_count": None, "rate_limited": False, "retry_after": None},
+            _extract_user_count
+        )
     
     def check_conversations_list(self, limit: int = 1) -> dict:
         """conversations.list API 상태를 확인합니다."""
-        result = {
-            "test": "conversations.list",
-            "success": False,
-            "channel_count": None,
-            "rate_limited": False,
-            "retry_after": None,
-            "error": None,
-            "response_time_ms": None
-        }
-        
-        start_time = time.time()
-        try:
-            response = self.client.conversations_list(limit=limit, types="im,mpim,private_channel")
-            elapsed = (time.time() - start_time) * 1000
-            
-            result["success"] = response["ok"]
-            result["channel_count"] = len(response.get("channels", []))
-            result["response_time_ms"] = round(elapsed, 2)
-            
-        except SlackApiError as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["response_time_ms"] = round(elapsed, 2)
-            
-            if e.response and e.response.status_code == 429:
-                result["rate_limited"] = True
-                result["retry_after"] = int(e.response.headers.get("Retry-After", 0))
-                result["error"] = f"Rate limited. Retry after {result['retry_after']} seconds"
-            else:
-                result["error"] = str(e)
-                if e.response:
-                    result["status_code"] = e.response.status_code
-        except Exception as e:
-            elapsed = (time.time() - start_time) * 1000
-            result["error"] = f"Connection error: {str(e)}"
-            result["response_time_ms"] = round(elapsed, 2)
-            if "timed out" in str(e).lower() or "timeout" in str(e).lower():
-                result["timeout"] = True
-        
-        return result
+        return self._run_check(
+            "conversations.list",
+            lambda: self.client.conversations_list(limit=limit, types="im,mpim,private_channel"),
+            {"channel_count": None, "rate_limited": False, "retry_after": None},
+            _extract_channel_count
+        )
     
     def run_all_checks(self, verbose: bool = True) -> dict:
         """모든 상태 체크를 실행합니다."""
@@ -210,10 +205,17 @@ class SlackStatusChecker:
                     print("   ⚠️  TIMEOUT 발생!")
             return results  # 인증 실패시 중단
         
+        # 나머지 체크는 서로 독립적이므로 동시에 요청하고, 결과는 순서대로 출력
+        executor = ThreadPoolExecutor(max_workers=3)
+        api_future = executor.submit(self.check_rate_limit)
+        users_future = executor.submit(self.check_users_list)
+        conv_future = executor.submit(self.check_conversations_list)
+        executor.shutdown(wait=False)
+        
         # 2. API 테스트 (rate limit 확인)
         if verbose:
             print("\n🔍 API 상태 확인 중 (api.test)...")
-        api_result = self.check_rate_limit()
+        api_result = api_future.result()
         results["checks"]["api_test"] = api_result
         
         if api_result["success"]:
@@ -232,7 +234,7 @@ class SlackStatusChecker:
         # 3. Users List 테스트
         if verbose:
             print("\n🔍 사용자 목록 API 확인 중 (users.list)...")
-        users_result = self.check_users_list()
+        users_result = users_future.result()
         results["checks"]["users_list"] = users_result
         
         if users_result["success"]:
@@ -251,7 +253,7 @@ class SlackStatusChecker:
         # 4. Conversations List 테스트
         if verbose:
             print("\n🔍 대화 목록 API 확인 중 (conversations.list)...")
-        conv_result = self.check_conversations_list()
+        conv_result = conv_future.result()
         results["checks"]["conversations_list"] = conv_result
         
         if conv_result["success"]:
@@ -357,6 +359,7 @@ def main():
   python check_slack_status.py --timeout 10       # 10초 timeout으로 체크
   python check_slack_status.py --quick            # 빠른 체크 (인증만)
   python check_slack_status.py --json             # JSON 형식으로 출력
+  python check_slack_status.py --quick --cache-seconds 300  # 인증 결과 5분간 캐시
         """
     )
     parser.add_argument(
@@ -375,6 +378,12 @@ def main():
         action="store_true", 
         help="JSON 형식으로 결과 출력"
     )
+    parser.add_argument(
+        "--cache-seconds", 
+        type=int, 
+        default=0, 
+        help="auth.test 성공 결과를 디스크에 캐시할 시간 (초, 기본값: 0 = 캐시 안 함)"
+    )
     
     args = parser.parse_args()
     
@@ -383,7 +392,7 @@ def main():
         print("ERROR: export SLACK_USER_TOKEN='xoxp-...'", file=sys.stderr)
         sys.exit(1)
     
-    checker = SlackStatusChecker(token, timeout=args.timeout)
+    checker = SlackStatusChecker(token, timeout=args.timeout, cache_seconds=args.cache_seconds)
     
     if args.quick:
         # 빠른 체크 - 인증만
@@ -392,7 +401,6 @@ def main():
         result = checker.check_auth()
         
         if args.json:
-            import json
             print(json.dumps(result, ensure_ascii=False, indent=2))
         else:
             if result["success"]:
@@ -412,7 +420,6 @@ def main():
         results = checker.run_all_checks(verbose=not args.json)
         
         if args.json:
-            import json
             print(json.dumps(results, ensure_ascii=False, indent=2))
         
         # 종료 코드 설정
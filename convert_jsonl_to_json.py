@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 """
 JSONL 파일을 JSON 파일로 변환하는 스크립트
-slack_backup 디렉토리 아래의 모든 messages.jsonl 파일을 찾아서 messages.json으로 변환합니다.
+slack_backup 디렉토리 아래의 모든 messages.jsonl 파일과
+main.py --jsonl로 만든 기간별 YYYY-MM-DD.jsonl (또는 YYYY-MM.jsonl, YYYY.jsonl) 파일을 찾아서 같은 이름의 .json으로 변환합니다.
 """
 
-import os
 import json
+import os
+import re
 import sys
 from pathlib import Path
 
+from split_messages_by_date import _dumps, _iter_files, _loads
+
+# main.py --jsonl 옵션이 만드는 기간별 파일 이름 (--file-granularity에 따라 일/월/연)
+_DATE_JSONL_RE = re.compile(r'\d{4}(?:-\d{2}){0,2}\.jsonl$')
+
 
 def convert_jsonl_to_json(jsonl_file_path: Path) -> bool:
     """
@@ -20,38 +27,47 @@ def convert_jsonl_to_json(jsonl_file_path: Path) -> bool:
     Returns:
         bool: 변환 성공 여부
     """
+    # JSON 파일로 저장 (같은 디렉토리에 확장자만 .json으로)
+    json_file_path = jsonl_file_path.with_suffix(".json")
+    # 임시 파일에 다 쓴 뒤에 교체 (중간에 실패해도 기존 .json이 깨지지 않음)
+    tmp_file_path = json_file_path.with_suffix(".json.tmp")
     try:
-        messages = []
-
-        # JSONL 파일 읽기
-        with open(jsonl_file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if line:  # 빈 줄 무시
-                    try:
-                        message = json.loads(line)
-                        messages.append(message)
-                    except json.JSONDecodeError as e:
-                        print(f"Warning: JSON 파싱 에러 in {jsonl_file_path}:{line_num} - {e}")
-                        continue
-
-        # JSON 파일로 저장 (같은 디렉토리에 messages.json으로)
-        json_file_path = jsonl_file_path.parent / "messages.json"
-
-        with open(json_file_path, 'w', encoding='utf-8') as f:
-            json.dump(messages, f, ensure_ascii=False, indent=2)
-
-        print(f"✓ 변환 완료: {jsonl_file_path} -> {json_file_path} ({len(messages)}개 메시지)")
+        message_count = 0
+
+        # JSONL을 한 줄씩 읽으면서 JSON 배열을 바로 출력 파일에 기록
+        # (전체 메시지 리스트를 메모리에 올리지 않음)
+        with open(jsonl_file_path, 'rb', buffering=1 << 20) as src, \
+                open(tmp_file_path, 'wb', buffering=1 << 20) as dst:
+            dst.write(b'[')
+            # 바이트 줄을 디코딩/strip 없이 그대로 파서에 전달 (앞뒤 공백은 파서가 허용)
+            for line_num, line in enumerate(src, 1):
+                if line.isspace():  # 빈 줄 무시
+                    continue
+                try:
+                    message = _loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Warning: JSON 파싱 에러 in {jsonl_file_path}:{line_num} - {e}")
+                    continue
+
+                # json.dump(indent=2)와 같은 모양이 되도록 한 단계 들여쓰기
+                dst.write(b',\n  ' if message_count else b'\n  ')
+                dst.write(_dumps(message).replace(b'\n', b'\n  '))
+                message_count += 1
+            dst.write(b'\n]' if message_count else b']')
+        os.replace(tmp_file_path, json_file_path)
+
+        print(f"✓ 변환 완료: {jsonl_file_path} -> {json_file_path} ({message_count}개 메시지)")
         return True
 
     except Exception as e:
+        tmp_file_path.unlink(missing_ok=True)
         print(f"✗ 변환 실패: {jsonl_file_path} - {e}")
         return False
 
 
 def find_and_convert_messages_jsonl(root_dir: Path) -> None:
     """
-    root_dir 아래의 모든 messages.jsonl 파일을 찾아서 변환
+    root_dir 아래의 모든 messages.jsonl 및 날짜별 .jsonl 파일을 찾아서 변환
 
     Args:
         root_dir: 검색할 루트 디렉토리
@@ -61,10 +77,11 @@ def find_and_convert_messages_jsonl(root_dir: Path) -> None:
 
     print(f"slack_backup 디렉토리에서 messages.jsonl 파일들을 찾는 중: {root_dir}")
 
-    # messages.jsonl 파일들을 재귀적으로 찾기
-    jsonl_files = list(root_dir.rglob("messages.jsonl"))
+    # messages.jsonl 및 날짜별 .jsonl 파일들을 재귀적으로 찾기
+    jsonl_files = [Path(p) for p in _iter_files(
+        root_dir, lambda n: n == "messages.jsonl" or _DATE_JSONL_RE.match(n))]
 
-    print(f"총 {len(jsonl_files)}개의 messages.jsonl 파일을 찾았습니다.")
+    print(f"총 {len(jsonl_files)}개의 .jsonl 파일을 찾았습니다.")
 
     for jsonl_file in jsonl_files:
         if convert_jsonl_to_json(jsonl_file):
@@ -6,12 +6,105 @@
 2명으로 복제합니다 (자신과의 대화 처리).
 """
 
-import json
 import argparse
+import os
 import pathlib
+import shutil
 import sys
 
-def fix_self_dm_members(backup_dir: str, dry_run: bool = False):
+from split_messages_by_date import _dumps, _loads
+
+def _fix_dm(dm: dict, dry_run: bool) -> bool:
+    """DM 하나를 검사해서 자신과의 대화이면 members를 복제합니다. 대상이면 True 반환."""
+    members = dm.get("members", [])
+
+    # DM에서 멤버가 1명이면 자신과의 대화
+    if len(members) != 1:
+        return False
+
+    user_id = members[0]
+    print(f"자신과의 대화 발견: {dm['id']} - 사용자 {user_id}")
+
+    if not dry_run:
+        dm["members"] = [user_id, user_id]
+        print(f"  → 수정: members를 [{user_id}, {user_id}]로 변경")
+    else:
+        print(f"  → [미리보기] members를 [{user_id}, {user_id}]로 변경 예정")
+
+    return True
+
+def _backup_original(backup_path: pathlib.Path, dms_file: pathlib.Path):
+    """원본 dms.json을 dms.json.backup으로 한 번만 복사해 둡니다."""
+    backup_file = backup_path / "dms.json.backup"
+    if not backup_file.exists():
+        shutil.copy2(dms_file, backup_file)
+        print(f"원본 파일 백업: {backup_file}")
+
+def _fix_self_dm_streaming(backup_path: pathlib.Path, dms_file: pathlib.Path,
+                           dry_run: bool, compact: bool) -> bool:
+    """ijson으로 DM을 하나씩 읽어 새 파일에 바로 기록합니다 (대용량 dms.json용)."""
+    try:
+        import ijson
+    except ImportError:
+        print("Error: --streaming 옵션에는 ijson 패키지가 필요합니다.", file=sys.stderr)
+        return False
+
+    tmp_file = dms_file.with_suffix('.json.tmp')
+    total_count = 0
+    modified_count = 0
+
+    try:
+        with open(dms_file, 'rb') as src:
+            if dry_run:
+                for dm in ijson.items(src, 'item', use_float=True):
+                    if _fix_dm(dm, dry_run):
+                        modified_count += 1
+                    total_count += 1
+            else:
+                with open(tmp_file, 'wb') as dst:
+                    dst.write(b'[')
+                    for dm in ijson.items(src, 'item', use_float=True):
+                        if _fix_dm(dm, dry_run):
+                            modified_count += 1
+                        if compact:
+                            if total_count:
+                                dst.write(b',')
+                            dst.write(_dumps(dm, compact=True))
+                        else:
+                            # json.dump(indent=2)와 같은 모양이 되도록 한 단계 들여쓰기
+                            dst.write(b',\n  ' if total_count else b'\n  ')
+                            dst.write(_dumps(dm).replace(b'\n', b'\n  '))
+                        total_count += 1
+                    dst.write(b'\n]' if total_count and not compact else b']')
+    except BaseException:
+        # 읽기/쓰기 중에 실패하면 쓰다 만 임시 파일을 지우고 원본은 그대로 둠
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    print(f"총 {total_count}개의 DM 확인 완료")
+
+    if modified_count == 0:
+        tmp_file.unlink(missing_ok=True)
+        print("수정할 자신과의 대화가 없습니다.")
+        return True
+
+    print(f"\n총 {modified_count}개의 자신과의 대화를 찾았습니다.")
+
+    if dry_run:
+        print("\n미리보기 모드입니다. 실제 적용하려면 --dry-run 옵션을 제거하세요.")
+        return True
+
+    try:
+        _backup_original(backup_path, dms_file)
+        os.replace(tmp_file, dms_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    print(f"수정 완료: {dms_file}")
+    return True
+
+def fix_self_dm_members(backup_dir: str, dry_run: bool = False, streaming: bool = False,
+                        compact: bool = False):
     """자신과의 대화의 members를 수정합니다."""
     backup_path = pathlib.Path(backup_dir)
     dms_file = backup_path / "dms.json"
@@ -21,27 +114,18 @@ def fix_self_dm_members(backup_dir: str, dry_run: bool = False):
         return False
 
     try:
+        if streaming:
+            return _fix_self_dm_streaming(backup_path, dms_file, dry_run, compact)
+
         # 기존 파일 읽기
-        with open(dms_file, 'r', encoding='utf-8') as f:
-            dms_data = json.load(f)
+        with open(dms_file, 'rb') as f:
+            dms_data = _loads(f.read())
 
         print(f"총 {len(dms_data)}개의 DM 확인 중...")
 
         modified_count = 0
         for dm in dms_data:
-            members = dm.get("members", [])
-
-            # DM에서 멤버가 1명이면 자신과의 대화
-            if len(members) == 1:
-                user_id = members[0]
-                print(f"자신과의 대화 발견: {dm['id']} - 사용자 {user_id}")
-
-                if not dry_run:
-                    dm["members"] = [user_id, user_id]
-                    print(f"  → 수정: members를 [{user_id}, {user_id}]로 변경")
-                else:
-                    print(f"  → [미리보기] members를 [{user_id}, {user_id}]로 변경 예정")
-
+            if _fix_dm(dm, dry_run):
                 modified_count += 1
 
         if modified_count == 0:
@@ -53,15 +137,13 @@ def fix_self_dm_members(backup_dir: str, dry_run: bool = False):
         # 실제 수정 모드인 경우 파일 저장
         if not dry_run:
             # 백업 생성
-            backup_file = backup_path / "dms.json.backup"
-            if not backup_file.exists():
-                import shutil
-                shutil.copy2(dms_file, backup_file)
-                print(f"원본 파일 백업: {backup_file}")
-
-            # 수정된 데이터 저장
-            with open(dms_file, 'w', encoding='utf-8') as f:
-                json.dump(dms_data, f, ensure_ascii=False, indent=2)
+            _backup_original(backup_path, dms_file)
+
+            # 수정된 데이터를 임시 파일에 쓴 뒤 원자적으로 교체 (중간에 죽어도 원본 보존)
+            tmp_file = dms_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps(dms_data, compact))
+            os.replace(tmp_file, dms_file)
             print(f"수정 완료: {dms_file}")
         else:
             print("\n미리보기 모드입니다. 실제 적용하려면 --dry-run 옵션을 제거하세요.")
@@ -80,6 +162,7 @@ def main():
 사용 예시:
   python fix_self_dm.py ./backup          # 수정 실행
   python fix_self_dm.py ./backup --dry-run # 미리보기 모드
+  python fix_self_dm.py ./backup --streaming # 대용량 dms.json 스트리밍 처리
         """
     )
 
@@ -92,6 +175,16 @@ def main():
         action="store_true",
         help="실제 수정하지 않고 미리보기만 출력"
     )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="dms.json을 통째로 읽지 않고 한 항목씩 처리 (대용량 파일용, ijson 필요)"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="들여쓰기 없이 압축된 JSON으로 저장"
+    )
 
     args = parser.parse_args()
 
@@ -100,7 +193,7 @@ def main():
     print(f"모드: {'미리보기' if args.dry_run else '실제 수정'}")
     print()
 
-    success = fix_self_dm_members(args.backup_dir, args.dry_run)
+    success = fix_self_dm_members(args.backup_dir, args.dry_run, args.streaming, args.compact)
 
     if success:
         print("\n작업이 성공적으로 완료되었습니다.")
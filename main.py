@@ -1,36 +1,198 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
 import json
 import os
 import pathlib
+import queue
+import random
 import re
+import socket
 import sys
+import threading
 import time
-from collections import defaultdict
-from datetime import datetime, timezone
-from typing import Dict, List
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from tqdm import tqdm
 
+from split_messages_by_date import _dumps, _loads, split_messages_by_date
+
 # ---------- 설정 ----------
 PAGE_LIMIT = 1000  # Slack 최대 1000
+DEFAULT_WORKERS = 4  # 동시에 처리할 대화 수
+THREAD_FETCH_WORKERS = 8  # 스레드 답글을 동시에 가져올 수 (모든 대화가 공유)
+MAX_INFLIGHT_REQUESTS = 8  # 동시에 진행 중인 Slack API 호출 수 상한
+
+# Slack Web API 메서드별 분당 호출 한도 (rate limit tier 기준)
+METHOD_RPM = {
+    "users_list": 20,              # Tier 2
+    "conversations_list": 20,      # Tier 2
+    "conversations_info": 50,      # Tier 3
+    "conversations_history": 50,   # Tier 3
+    "conversations_replies": 50,   # Tier 3
+    "conversations_members": 100,  # Tier 4
+    "auth_test": 100,              # Special (Tier 4 수준)
+}
+DEFAULT_RPM = 50
+
+CACHE_DIRNAME = ".cache"  # 사용자/대화 목록 캐시 폴더 (출력 폴더 아래)
+DEFAULT_CACHE_TTL = 24 * 60 * 60  # 캐시 유효 시간 (초)
+MEMBERS_CACHE_TTL = 60 * 60  # 대화 멤버 목록 캐시 유효 시간 (초)
+WATERMARKS_FILE = "watermarks.json"  # 대화별 마지막 백업 메시지 ts (캐시 폴더 안)
+# --slim: 저장할 메시지 필드 (blocks, bot_profile, client_msg_id 등은 제외)
+SLIM_KEYS = ("type", "subtype", "ts", "user", "text", "thread_ts", "reply_count", "files", "reactions", "edited")
+FILE_GRANULARITIES = ("day", "month", "year", "auto")  # 메시지 파일을 묶는 기간 단위
+PERIOD_NAME_LEN = {"day": 10, "month": 7, "year": 4}  # YYYY-MM-DD에서 잘라 쓸 길이
+AUTO_GRANULARITY_MIN_BYTES = 16 * 1024  # auto: 파일 하나의 평균 크기가 이보다 작으면 더 큰 단위로 묶음
+AUTO_GRANULARITY_SAMPLE = 64  # auto: 전체 크기를 추정할 때 직렬화해 보는 메시지 수
+WRITE_QUEUE_SIZE = 16  # 기록을 기다리는 대화(파일 묶음) 수 상한 (메모리 제한)
+
+# urllib(slack_sdk)이 timeout을 알리는 예외 (URLError의 reason으로 감싸져 오기도 함)
+_TIMEOUT_ERRORS = (socket.timeout, TimeoutError)
 
 # ---------- 유틸 ----------
+
+# 메시지 파일 이름: YYYY-MM-DD / YYYY-MM / YYYY (--file-granularity에 따라)
+_DATE_FILE_RE = re.compile(r'\d{4}(?:-\d{2}){0,2}\.jsonl?$')
+# 파일시스템에서 금지된 문자들(/ \ : * ? " < > |)과 제어문자를 언더스코어로 바꾸는 변환표
+_SANITIZE_TABLE = {ord(c): '_' for c in '/\\:*?"<>|'}
+_SANITIZE_TABLE.update({i: '_' for i in range(0x20)})
+_SANITIZE_TABLE[0x7f] = '_'
+_UNDERSCORE_RE = re.compile(r'_{2,}')
+
+def _atomic_write(path: pathlib.Path, data: bytes):
+    """임시 파일(.tmp)에 쓴 뒤 os.replace로 교체합니다 (중간에 죽어도 기존 파일이 깨지지 않음)."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+def _fsync_dir(directory: pathlib.Path):
+    """폴더 항목(파일 이름 교체)을 디스크에 반영합니다. 지원하지 않는 OS에서는 건너뜁니다."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _atomic_write_many(directory: pathlib.Path, files: List[Tuple[pathlib.Path, bytes]]):
+    """한 폴더의 여러 파일을 임시 파일에 모두 쓴 뒤 한꺼번에 교체합니다.
+
+    파일마다 fsync 하지 않고 교체가 끝난 뒤 폴더만 한 번 fsync 합니다.
+    """
+    replaced = []
+    try:
+        for path, data in files:
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            replaced.append((tmp_path, path))
+            tmp_path.write_bytes(data)
+    except BaseException:
+        # 중간에 실패하면 이미 만든 임시 파일(쓰다 만 것 포함)을 지우고 기존 파일은 그대로 둠
+        for tmp_path, _ in replaced:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        raise
+    for tmp_path, path in replaced:
+        os.replace(tmp_path, path)
+    _fsync_dir(directory)
+
+def _regroup_by_period(date_groups: Dict[str, List[dict]], name_len: int) -> Dict[str, List[dict]]:
+    """날짜별 그룹을 YYYY-MM 또는 YYYY 단위로 합칩니다 (날짜 순으로 이어 붙여 시간순 유지)."""
+    period_groups = defaultdict(list)
+    for date_str in sorted(date_groups):
+        key = date_str if date_str == "unknown-date" else date_str[:name_len]
+        period_groups[key].extend(date_groups[date_str])
+    return dict(period_groups)
+
+def _drain_write_queue(write_queue: queue.Queue):
+    """큐에서 (폴더, [(경로, 바이트)], 완료 콜백)을 꺼내 파일로 씁니다. None을 받으면 종료합니다.
+
+    완료 콜백은 파일을 모두 쓴 경우에만 호출하므로, 실패한 대화의 증분 백업 기준점은 앞으로 나가지 않습니다.
+    """
+    while True:
+        item = write_queue.get()
+        if item is None:
+            break
+        directory, files, on_written = item
+        try:
+            _atomic_write_many(directory, files)
+        except Exception as e:
+            print(f"[WARN] Failed to write files in {directory}: {e}", file=sys.stderr)
+            continue
+        if on_written is not None:
+            on_written()
+
+def _write_json_array(path: pathlib.Path, items: Iterable[dict]):
+    """항목을 하나씩 직렬화해 JSON 배열 파일로 씁니다 (임시 파일에 쓴 뒤 교체).
+
+    결과는 _dumps(list)와 같은 모양(2칸 들여쓰기)입니다.
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    count = 0
+    with open(tmp_path, 'wb', buffering=1 << 20) as f:
+        f.write(b'[')
+        for item in items:
+            f.write(b',\n  ' if count else b'\n  ')
+            f.write(_dumps(item).replace(b'\n', b'\n  '))
+            count += 1
+        f.write(b'\n]' if count else b']')
+    os.replace(tmp_path, path)
+
+def _ts_key(message: dict) -> float:
+    """정렬용 ts 값. 숫자로 바꿀 수 없는 ts(unknown-date 파일 등)는 split_messages_by_date처럼 0.0으로 둡니다."""
+    try:
+        return float(message.get("ts") or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+def _history_watermark(messages: Iterable[dict]) -> Optional[float]:
+    """conversations.history로 받은 메시지(스레드 답글 제외) 중 가장 최근 ts를 반환합니다.
+
+    스레드 답글은 부모 메시지를 통해 따로 가져오므로, 오래된 스레드에 늦게 달린 답글의 ts를
+    기준점으로 쓰면 그 사이에 올라온 일반 메시지를 다음 증분 백업에서 놓치게 됩니다.
+    채널에도 같이 보낸 답글(thread_broadcast)은 기록에도 나오므로 포함합니다.
+    """
+    newest = None
+    for m in messages:
+        ts = m.get("ts")
+        if not ts:
+            continue
+        thread_ts = m.get("thread_ts")
+        if thread_ts and thread_ts != ts and m.get("subtype") != "thread_broadcast":
+            continue
+        try:
+            ts = float(ts)
+        except (ValueError, TypeError):
+            continue
+        if newest is None or ts > newest:
+            newest = ts
+    return newest
+
 def sanitize(name: str) -> str:
     """파일명으로 사용할 수 있도록 문자열을 정리합니다.
 
     한글을 포함한 유니코드 문자는 유지하고,
     파일시스템에서 문제가 되는 특수문자만 언더스코어로 치환합니다.
     """
-    # 파일시스템에서 금지된 문자들: / \ : * ? " < > |
-    # 그리고 제어문자들을 언더스코어로 치환
-    forbidden_chars = r'[/\\:*?"<>|\x00-\x1f\x7f]'
-    sanitized = re.sub(forbidden_chars, '_', name)
+    # 파일시스템에서 금지된 문자와 제어문자를 언더스코어로 치환 (정규식 대신 str.translate)
+    sanitized = name.translate(_SANITIZE_TABLE)
 
     # 연속된 언더스코어를 하나로 줄임
-    sanitized = re.sub(r'_+', '_', sanitized)
+    if '__' in sanitized:
+        sanitized = _UNDERSCORE_RE.sub('_', sanitized)
 
     # 앞뒤 공백과 언더스코어 제거
     sanitized = sanitized.strip(' _')
@@ -48,49 +210,134 @@ def sanitize(name: str) -> str:
 
     return sanitized or 'unnamed_channel'
 
-def timestamp_to_date(ts: str) -> str:
-    """타임스탬프를 UTC 날짜(YYYY-MM-DD)로 변환"""
-    try:
-        # Slack timestamp는 Unix timestamp (초 단위, 소수점 포함)
-        timestamp = float(ts)
-        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-        return dt.strftime('%Y-%m-%d')
-    except (ValueError, TypeError):
-        print(f"Warning: Invalid timestamp {ts}")
-        return "unknown-date"
+class RateLimiter:
+    """Slack API 호출 속도를 미리 조절하는 리미터 (여러 스레드에서 공유).
 
-def split_messages_by_date(messages: List[dict]) -> Dict[str, List[dict]]:
-    """메시지를 날짜별로 그룹화"""
-    date_groups = defaultdict(list)
+    - 메서드별로 최근 60초 동안의 호출 시각을 기록해 분당 한도(RPM)를 넘기 전에 대기합니다.
+    - 429/5xx/타임아웃이 나면 동시 호출 수 상한을 절반으로 줄이고(multiplicative decrease),
+      연속으로 성공하면 조금씩 다시 늘립니다(additive increase).
+    - Retry-After나 남은 호출 수 헤더가 있으면 해당 메서드 호출을 그 시간만큼 멈춥니다.
+    """
 
-    for msg in messages:
-        ts = msg.get("ts")
-        if not ts:
-            continue
+    def __init__(self, rpm_limits: Dict[str, int], max_concurrency: int, recover_after: int = 10):
+        self._cond = threading.Condition()
+        self._rpm_limits = rpm_limits
+        self._max_concurrency = max_concurrency
+        self._concurrency = float(max_concurrency)
+        self._recover_after = recover_after
+        self._calls = defaultdict(deque)  # method -> 최근 호출 시각들
+        self._paused_until = defaultdict(float)  # method -> 재개 시각
+        self._inflight = 0
+        self._successes = 0
 
-        date_str = timestamp_to_date(ts)
-        date_groups[date_str].append(msg)
+    def acquire(self, method: str):
+        """호출해도 될 때까지 기다린 뒤 호출 슬롯을 차지합니다."""
+        rpm = self._rpm_limits.get(method, DEFAULT_RPM)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                window = self._calls[method]
+                while window and now - window[0] >= 60:
+                    window.popleft()
 
-    # 각 날짜 그룹 내에서 시간순 정렬
-    for date_str in date_groups:
-        date_groups[date_str].sort(key=lambda x: float(x.get("ts", "0")))
+                if now < self._paused_until[method]:
+                    timeout = self._paused_until[method] - now
+                elif len(window) >= rpm:
+                    timeout = 60 - (now - window[0])
+                elif self._inflight >= int(self._concurrency):
+                    timeout = None  # 다른 호출이 끝나길 기다림
+                else:
+                    window.append(now)
+                    self._inflight += 1
+                    return
+                self._cond.wait(timeout)
 
-    return dict(date_groups)
+    def release(self, method: str, success: bool, throttled: bool = False, pause: float = 0):
+        """호출 결과를 반영하고 슬롯을 반납합니다."""
+        with self._cond:
+            self._inflight -= 1
+            if throttled:
+                self._concurrency = max(1.0, self._concurrency * 0.5)
+                self._successes = 0
+            elif success:
+                self._successes += 1
+                if self._successes >= self._recover_after:
+                    self._concurrency = min(self._max_concurrency, self._concurrency + 0.5)
+                    self._successes = 0
+            if pause > 0:
+                resume_at = time.monotonic() + pause
+                self._paused_until[method] = max(self._paused_until[method], resume_at)
+            self._cond.notify_all()
 
-def backoff_retry(func, *args, **kwargs):
-    while True:
+def _pause_from_headers(resp) -> float:
+    """응답 헤더의 남은 호출 수가 거의 없으면 리셋 시각까지 기다릴 시간(초)을 반환합니다."""
+    headers = getattr(resp, "headers", None) or {}
+    remaining = headers.get("X-Rate-Limit-Remaining")
+    reset = headers.get("X-Rate-Limit-Reset")
+    try:
+        if remaining is not None and reset is not None and int(remaining) <= 2:
+            return max(0.0, float(reset) - time.time())
+    except ValueError:
+        pass
+    return 0
+
+# 모든 스레드가 공유하는 Slack API 리미터
+rate_limiter = RateLimiter(METHOD_RPM, MAX_INFLIGHT_REQUESTS)
+
+def _is_timeout(e: Exception) -> bool:
+    """예외가 timeout인지 확인합니다 (urllib의 URLError로 감싸진 경우 포함)."""
+    return isinstance(e, _TIMEOUT_ERRORS) or isinstance(getattr(e, "reason", None), _TIMEOUT_ERRORS)
+
+def backoff_retry(func, *args, max_attempts: int = 8, base: float = 0.5, **kwargs):
+    """Slack API를 호출하고, 429/5xx 응답이나 타임아웃이면 지수 백오프(+지터)로 재시도합니다.
+
+    max_attempts번 시도해도 실패하면 마지막 SlackApiError를 그대로 발생시킵니다.
+    """
+    method = getattr(func, "__name__", "")
+    for attempt in range(max_attempts):
+        rate_limiter.acquire(method)
         try:
-            return func(*args, **kwargs)
+            resp = func(*args, **kwargs)
         except SlackApiError as e:
-            if e.response is not None and e.response.status_code == 429:
-                wait = int(e.response.headers.get("Retry-After", "5"))
+            status = e.response.status_code if e.response is not None else None
+            if status != 429 and (status is None or status < 500):
+                rate_limiter.release(method, success=False)
+                raise
+            if attempt == max_attempts - 1:
+                rate_limiter.release(method, success=False, throttled=True)
+                raise
+
+            # 여러 스레드가 동시에 재시도하지 않도록 지터 추가
+            backoff = base * 2 ** attempt
+            if status == 429:
+                retry_after = float(e.response.headers.get("Retry-After", backoff))
+                wait = max(retry_after, backoff) + random.uniform(0, base)
+                # rate limit은 메서드 단위이므로 같은 메서드를 쓰는 다른 스레드도 함께 대기
+                rate_limiter.release(method, success=False, throttled=True, pause=wait)
+            else:
+                wait = backoff + random.uniform(0, base)
+                rate_limiter.release(method, success=False, throttled=True)
                 time.sleep(wait)
-                continue
+            continue
+        except Exception as e:
+            if not _is_timeout(e):
+                rate_limiter.release(method, success=False)
+                raise
+            # 응답이 늦어지는 것도 과부하 신호이므로 5xx와 같이 동시 호출 수를 줄이고 재시도
+            rate_limiter.release(method, success=False, throttled=True)
+            if attempt == max_attempts - 1:
+                raise
+            time.sleep(base * 2 ** attempt + random.uniform(0, base))
+            continue
+        except BaseException:
+            rate_limiter.release(method, success=False)
             raise
+        rate_limiter.release(method, success=True, pause=_pause_from_headers(resp))
+        return resp
 
 # ---------- 수집기 ----------
 class SlackBackup:
-    def __init__(self, token: str, outdir: str, types: List[str], conversation_id: str = None, oldest: float = None, latest: float = None, force: bool = False):
+    def __init__(self, token: str, outdir: str, types: List[str], conversation_id: str = None, oldest: float = None, latest: float = None, force: bool = False, workers: int = DEFAULT_WORKERS, cache_ttl: float = DEFAULT_CACHE_TTL, refresh_cache: bool = False, jsonl: bool = False, include_members: bool = False, file_granularity: str = "day", slim: bool = False):
         self.client = WebClient(token=token)
         self.token = token
         self.outdir = pathlib.Path(outdir)
@@ -100,58 +347,196 @@ class SlackBackup:
         self.oldest = oldest
         self.latest = latest
         self.force = force
+        self.workers = max(1, workers)
+        self.cache_dir = self.outdir / CACHE_DIRNAME
+        self.cache_ttl = cache_ttl
+        self.refresh_cache = refresh_cache
+        self.jsonl = jsonl  # 날짜별 파일을 JSON Lines로 이어 쓰기
+        self.include_members = include_members  # 공개 채널도 멤버 목록 수집
+        self.file_granularity = file_granularity  # 메시지 파일 단위: day/month/year/auto
+        self.slim = slim  # SLIM_KEYS 필드만 저장
         self.user_map = {}  # user_id -> profile dict
+        self._team_id = None  # auth.test로 얻은 워크스페이스 ID (목록 캐시 이름에 사용)
+        self._channel_info = {}  # channel_id -> conversations.info 결과
+        self._watermarks = {}  # channel_id -> 마지막으로 저장한 메시지 ts
+        self._watermarks_lock = threading.Lock()
+        self._thread_pool = None  # run() 동안 스레드 답글 조회에 쓰는 스레드 풀
+        self._write_queue = None  # run() 동안 날짜 파일을 넘겨받아 쓰는 기록 스레드의 큐
+        self._message_bar = None  # run() 동안 수집한 메시지 수를 보여주는 진행 표시줄
+        # conversations.history에 매번 넘기는 고정 인자 (기간 제한이 없으면 None 인자를 아예 빼 둠)
+        self._history_kwargs = {"inclusive": False}
+        if latest:
+            self._history_kwargs["latest"] = str(latest)
+
+    def _load_cache(self, name: str, ttl: float = None) -> Optional[list]:
+        """캐시 파일이 유효 시간 이내이면 내용을 반환합니다.
+
+        만료 직전에는 확률적으로 미리 만료시켜, 여러 번의 실행이 한꺼번에
+        전체 목록을 다시 받아오지 않도록 합니다. ttl을 주면 --cache-ttl보다 짧게 적용합니다.
+        """
+        ttl = self.cache_ttl if ttl is None else min(ttl, self.cache_ttl)
+        if self.refresh_cache or ttl <= 0:
+            return None
+        path = self.cache_dir / name
+        try:
+            age = time.time() - path.stat().st_mtime
+            # 유효 시간의 마지막 10% 구간에서는 확률적으로 미리 갱신
+            if age >= ttl - random.random() * ttl * 0.1:
+                return None
+            return _loads(path.read_bytes())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _save_cache(self, name: str, data):
+        """캐시 파일을 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+        path = self.cache_dir / name
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, _dumps(data, compact=True))
+        except OSError as e:
+            print(f"[WARN] Failed to write cache {path}: {e}", file=sys.stderr)
+
+    def _paginate(self, method, data_key: str, prefetch: bool = False, **kwargs):
+        """커서 기반 목록 API를 페이지(data_key 리스트) 단위로 yield 합니다.
+
+        prefetch이면 호출한 쪽이 현재 페이지를 처리하는 동안
+        다음 페이지를 백그라운드 스레드에서 미리 요청합니다.
+        """
+        if not prefetch:
+            cursor = None
+            while True:
+                resp = backoff_retry(method, limit=PAGE_LIMIT, cursor=cursor, **kwargs)
+                yield resp.get(data_key, [])
+                cursor = resp.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    return
+
+        pages = queue.Queue(maxsize=1)  # 미리 받아 둘 페이지는 하나만
+        stop = threading.Event()  # 호출한 쪽이 중간에 그만두면 설정됨
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def fetch_pages():
+            cursor = None
+            try:
+                while not stop.is_set():
+                    resp = backoff_retry(method, limit=PAGE_LIMIT, cursor=cursor, **kwargs)
+                    put(resp.get(data_key, []))
+                    cursor = resp.get("response_metadata", {}).get("next_cursor")
+                    if not cursor:
+                        break
+            except Exception as e:  # 호출한 쪽 스레드에서 다시 발생시킴
+                put(e)
+            put(None)
+
+        threading.Thread(target=fetch_pages, daemon=True).start()
+        try:
+            while True:
+                item = pages.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def _workspace_id(self) -> str:
+        """토큰이 속한 워크스페이스(team) ID를 auth.test로 한 번만 조회합니다.
+
+        같은 출력 폴더를 다른 워크스페이스 토큰으로 쓸 때 목록 캐시가 섞이지 않도록 캐시 이름에 넣습니다.
+        """
+        if self._team_id is None:
+            resp = backoff_retry(self.client.auth_test)
+            self._team_id = sanitize(resp.get("team_id") or "unknown")
+        return self._team_id
 
     def load_users(self):
-        cursor = None
-        while True:
-            resp = backoff_retry(self.client.users_list, limit=PAGE_LIMIT, cursor=cursor)
-            for u in resp["members"]:
-                self.user_map[u["id"]] = u
-            cursor = resp.get("response_metadata", {}).get("next_cursor")
-            if not cursor:
-                break
+        cache_name = f"users-{self._workspace_id()}.json"
+        users = self._load_cache(cache_name)
+        if users is None:
+            users = []
+            for page in self._paginate(self.client.users_list, "members"):
+                users.extend(page)
+            self._save_cache(cache_name, users)
+
+        for u in users:
+            self.user_map[u["id"]] = u
 
     def list_conversations(self):
-        conversations = []
-        cursor = None
         types_str = ",".join(self.types)
-        while True:
-            resp = backoff_retry(self.client.conversations_list, limit=PAGE_LIMIT, types=types_str, exclude_archived=True, cursor=cursor)
-            conversations.extend(resp["channels"])
-            cursor = resp.get("response_metadata", {}).get("next_cursor")
-            if not cursor:
-                break
+        cache_name = f"conversations-{self._workspace_id()}-{sanitize(types_str)}.json"
+        # --force이면 그 사이 새로 생긴 대화도 빠짐없이 백업하도록 대화 목록 캐시를 쓰지 않음
+        conversations = None if self.force else self._load_cache(cache_name)
+        if conversations is not None:
+            return conversations
+
+        conversations = []
+        for page in self._paginate(self.client.conversations_list, "channels", types=types_str, exclude_archived=True):
+            conversations.extend(page)
+        self._save_cache(cache_name, conversations)
         return conversations
 
     def get_channel_info(self, channel_id: str):
-        """특정 채널의 정보를 가져옵니다."""
-        resp = backoff_retry(self.client.conversations_info, channel=channel_id)
-        return resp["channel"]
+        """특정 채널의 정보를 가져옵니다 (같은 실행 안에서는 한 번만 호출)."""
+        if channel_id not in self._channel_info:
+            resp = backoff_retry(self.client.conversations_info, channel=channel_id)
+            self._channel_info[channel_id] = resp["channel"]
+        return self._channel_info[channel_id]
 
-    def load_existing_metadata(self, filename: str) -> List[dict]:
-        """기존 메타데이터 파일을 읽어옵니다."""
+    def load_existing_metadata(self, filename: str) -> Optional[List[dict]]:
+        """기존 메타데이터 파일을 읽어옵니다.
+
+        파일이 없으면 빈 리스트를 반환합니다 (exists() 확인 없이 바로 열어 stat 호출을 줄임).
+        파일이 깨져 읽을 수 없으면 None을 반환합니다.
+        """
         filepath = self.outdir / filename
-        if filepath.exists():
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, Exception) as e:
-                print(f"[WARN] Failed to load existing {filename}: {e}", file=sys.stderr)
-                return []
-        return []
+        try:
+            return _loads(filepath.read_bytes())
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"[WARN] Failed to load existing {filename}: {e}", file=sys.stderr)
+            return None
 
-    def merge_metadata(self, existing_meta: List[dict], new_meta: List[dict]) -> List[dict]:
-        """기존 메타데이터와 새로운 메타데이터를 병합합니다. ID 기준으로 중복을 제거합니다."""
-        # 기존 메타데이터를 ID로 인덱싱
-        existing_by_id = {item["id"]: item for item in existing_meta}
+    def merge_metadata(self, existing_meta: Iterable[dict], new_meta: List[dict]) -> List[dict]:
+        """기존 메타데이터와 새로운 메타데이터를 병합합니다. ID 기준으로 중복을 제거합니다.
 
-        # 새로운 메타데이터를 추가하거나 업데이트
-        for item in new_meta:
-            existing_by_id[item["id"]] = item
+        기존 파일은 ID 순으로 저장되어 있으므로 전체를 다시 정렬하지 않고
+        정렬한 새 항목과 한 번에 병합합니다 (같은 ID는 새 항목으로 갱신).
+        """
+        by_id = itemgetter("id")
+        new_items = sorted({item["id"]: item for item in new_meta}.values(), key=by_id)
+        existing = list(existing_meta)
+        if not existing:
+            return new_items
+        # 직접 편집 등으로 순서가 깨진 경우에만 정렬
+        if any(existing[i]["id"] > existing[i + 1]["id"] for i in range(len(existing) - 1)):
+            existing.sort(key=by_id)
 
-        # ID 순으로 정렬하여 반환
-        return sorted(existing_by_id.values(), key=lambda x: x["id"])
+        merged = []
+        i = j = 0
+        while i < len(existing) or j < len(new_items):
+            if j == len(new_items) or (i < len(existing) and existing[i]["id"] < new_items[j]["id"]):
+                item = existing[i]
+                i += 1
+            else:
+                item = new_items[j]
+                j += 1
+                # 같은 ID의 기존 항목은 건너뜀
+                while i < len(existing) and existing[i]["id"] == item["id"]:
+                    i += 1
+            if merged and merged[-1]["id"] == item["id"]:
+                merged[-1] = item  # 기존 파일 안의 중복 ID는 뒤의 것을 사용
+            else:
+                merged.append(item)
+        return merged
 
     def conv_label(self, conv) -> str:
         """채널 타입에 따른 폴더명을 생성합니다.
@@ -167,60 +552,101 @@ class SlackBackup:
         return sanitize(conv.get("name") or conv["id"])
 
     def get_members(self, channel_id: str) -> List[str]:
-        out, cursor = [], None
-        while True:
-            resp = backoff_retry(self.client.conversations_members, channel=channel_id, limit=PAGE_LIMIT, cursor=cursor)
-            out.extend(resp["members"])
-            cursor = resp.get("response_metadata", {}).get("next_cursor")
-            if not cursor: break
+        out = []
+        for page in self._paginate(self.client.conversations_members, "members", channel=channel_id):
+            out.extend(page)
         return out
 
-    def iter_history(self, channel_id: str):
-        cursor = None
-        while True:
-            resp = backoff_retry(
-                self.client.conversations_history,
-                channel=channel_id,
-                limit=PAGE_LIMIT,
-                cursor=cursor,
-                oldest=str(self.oldest) if self.oldest else None,
-                latest=str(self.latest) if self.latest else None,
-                inclusive=False
-            )
-            for m in resp.get("messages", []):
-                yield m
-            cursor = resp.get("response_metadata", {}).get("next_cursor")
-            if not cursor: break
+    def get_members_cached(self, channel_id: str, refresh: bool = False, sig=None) -> List[str]:
+        """멤버 목록을 캐시(.cache/members/{id}.json)에서 가져옵니다.
+
+        --force/--refresh-cache이면 항상 다시 조회합니다.
+        대화 정보의 updated 값(sig)이 있으면 캐시와 같을 때만 --cache-ttl 동안 그대로 쓰고, 다르면 다시 조회합니다.
+        sig가 없으면 새 메시지가 있었거나(refresh) 캐시가 MEMBERS_CACHE_TTL보다 오래되었을 때만 다시 조회합니다.
+        """
+        cache_name = f"members/{channel_id}.json"
+        if not self.force:  # --refresh-cache는 _load_cache가 처리
+            if sig is not None:
+                cached = self._load_cache(cache_name)
+                if isinstance(cached, dict) and cached.get("sig") == sig:
+                    return cached["members"]
+            elif not refresh:
+                cached = self._load_cache(cache_name, ttl=MEMBERS_CACHE_TTL)
+                if isinstance(cached, dict):
+                    return cached["members"]
+        members = self.get_members(channel_id)
+        self._save_cache(cache_name, {"sig": sig, "members": members})
+        return members
+
+    def iter_history(self, channel_id: str, oldest: float = None):
+        """대화 기록을 페이지(메시지 리스트) 단위로 yield 합니다.
+
+        현재 페이지를 처리하는 동안 다음 페이지를 미리 요청합니다.
+        """
+        # 증분 백업 시 마지막으로 저장한 ts 이후만 가져옴
+        oldest = max(self.oldest or 0, oldest or 0)
+        kwargs = self._history_kwargs
+        if oldest:
+            kwargs = {**kwargs, "oldest": str(oldest)}
+        yield from self._paginate(
+            self.client.conversations_history,
+            "messages",
+            prefetch=True,
+            channel=channel_id,
+            **kwargs
+        )
 
     def fetch_thread(self, channel_id: str, parent_ts: str):
-        cursor = None
         msgs = []
-        while True:
-            resp = backoff_retry(
-                self.client.conversations_replies,
-                channel=channel_id, ts=parent_ts, limit=PAGE_LIMIT, cursor=cursor
-            )
-            msgs.extend(resp.get("messages", []))
-            cursor = resp.get("response_metadata", {}).get("next_cursor")
-            if not cursor: break
+        for page in self._paginate(self.client.conversations_replies, "messages", channel=channel_id, ts=parent_ts):
+            msgs.extend(page)
         return msgs
 
-    def _collect_messages(self, channel_id: str) -> List[dict]:
-        """채널의 모든 메시지를 수집하고 스레드를 확장합니다."""
+    def _collect_messages(self, channel_id: str, oldest: float = None) -> List[dict]:
+        """채널의 메시지를 수집하고 스레드를 확장합니다. oldest가 있으면 그 이후 메시지만 수집합니다."""
+        # 기록은 페이지 단위로 한 번에 이어 붙이고, 스레드 답글은 부모를 만나는 즉시
+        # 스레드 풀에 맡겨 동시에 가져온 뒤 부모 바로 뒤에 끼워 넣어 기존 순서를 유지
+        history = []
+        threads = []  # (부모 위치, 부모 ts, 답글 future 또는 답글 리스트)
+        for page in self.iter_history(channel_id, oldest):
+            for i, msg in enumerate(page, len(history)):
+                # 스레드가 있으면 풀체인 수집 (부모 ts 기준)
+                if msg.get("thread_ts") == msg.get("ts") and msg.get("reply_count", 0) > 0:
+                    if self._thread_pool is not None:
+                        replies = self._thread_pool.submit(self.fetch_thread, channel_id, msg["ts"])
+                    else:
+                        replies = self.fetch_thread(channel_id, msg["ts"])
+                    threads.append((i, msg["ts"], replies))
+            history.extend(page)
+            self._count_messages(len(page))
+
+        if not threads:
+            return history
+
         out_msgs = []
-        for msg in self.iter_history(channel_id):
-            out_msgs.append(msg)
-            # 스레드가 있으면 풀체인 수집 (부모 ts 기준)
-            if msg.get("thread_ts") == msg.get("ts") and msg.get("reply_count", 0) > 0:
-                thread = self.fetch_thread(channel_id, msg["ts"])
-                # replies 결과에는 부모가 포함되므로 중복 제거
-                # (간단히 ts 기준으로 set 사용)
-                by_ts = {m["ts"]: m for m in thread}
-                out_msgs.extend([m for t,m in by_ts.items() if t != msg["ts"]])
+        start = 0
+        for i, parent_ts, replies in threads:
+            out_msgs.extend(history[start:i + 1])
+            start = i + 1
+            if not isinstance(replies, list):
+                replies = replies.result()
+            # replies 결과에는 부모가 포함되므로 부모만 건너뜀
+            # (replies는 중복 없이 시간순으로 오므로 별도 중복 제거 불필요)
+            out_msgs.extend(m for m in replies if m.get("ts") != parent_ts)
+            self._count_messages(len(replies) - 1)
+        out_msgs.extend(history[start:])
         return out_msgs
 
-    def _generate_metadata(self, conv: dict, label: str) -> dict:
-        """대화 정보로부터 메타데이터를 생성합니다."""
+    def _count_messages(self, count: int):
+        """수집한 메시지 수를 진행 표시줄에 반영합니다 (tqdm은 자체 잠금으로 스레드 안전)."""
+        if self._message_bar is not None and count > 0:
+            self._message_bar.update(count)
+
+    def _generate_metadata(self, conv: dict, label: str, refresh_members: bool = True) -> dict:
+        """대화 정보로부터 메타데이터를 생성합니다.
+
+        refresh_members가 False이면 유효한 멤버 캐시가 있을 때 API를 호출하지 않습니다.
+        """
         channel_id = conv["id"]
         meta = {"id": channel_id}
 
@@ -228,8 +654,12 @@ class SlackBackup:
         if conv.get("created"):
             meta["created"] = conv["created"]
 
-        # 멤버 리스트 가져오기 - 모든 타입에서 get_members 사용
-        members = self.get_members(channel_id)
+        # 멤버 리스트 가져오기 (캐시 우선) - 공개 채널은 멤버가 많아 호출이 많으므로
+        # --include-members일 때만 가져옴
+        if conv.get("is_im") or conv.get("is_mpim") or conv.get("is_private") or self.include_members:
+            members = self.get_members_cached(channel_id, refresh=refresh_members, sig=conv.get("updated"))
+        else:
+            members = []
 
         # 자신과의 대화(self-DM)인 경우 멤버를 복제
         if conv.get("is_im") and len(members) == 1:
@@ -254,98 +684,257 @@ class SlackBackup:
 
         return meta
 
-    def _classify_metadata(self, conv: dict, meta: dict, metadata_lists: dict):
-        """메타데이터를 대화 타입에 따라 분류합니다."""
+    def _metadata_type(self, conv: dict) -> str:
+        """대화 타입에 따라 메타데이터가 들어갈 목록 이름을 반환합니다."""
         if conv.get("is_im"):
             # DM - 기본 메타데이터만
-            metadata_lists["dms"].append(meta)
+            return "dms"
         elif conv.get("is_mpim"):
             # 다중대화(그룹DM)
-            metadata_lists["mpims"].append(meta)
+            return "mpims"
         elif conv.get("is_private"):
             # 그룹 (프라이빗 채널)
-            metadata_lists["groups"].append(meta)
+            return "groups"
         else:
             # 채널 (공개 채널)
-            metadata_lists["channels"].append(meta)
+            return "channels"
 
-    def _save_messages_by_date(self, messages: List[dict], conversation_dir: pathlib.Path):
-        """메시지를 날짜별로 분할하여 저장합니다."""
+    def _save_messages_by_date(self, messages: List[dict], conversation_dir: pathlib.Path, merge: bool = False, on_saved: Callable[[], None] = None):
+        """메시지를 날짜별로 분할하여 저장합니다.
+
+        merge가 True이면 이미 있는 날짜 파일의 메시지와 ts 기준으로 합칩니다 (증분 백업).
+        jsonl 옵션이면 {date}.jsonl에 새 메시지만 이어 씁니다.
+        slim 옵션이면 SLIM_KEYS 필드만 남깁니다.
+        file_granularity가 month/year이면 날짜 대신 YYYY-MM / YYYY 단위 파일로 묶습니다.
+        on_saved는 모든 파일이 디스크에 기록된 뒤에만 호출합니다 (기록 스레드를 쓰면 그 스레드에서).
+        """
         if not messages:
             return
 
+        if self.slim:
+            messages = [{k: m[k] for k in SLIM_KEYS if k in m} for m in messages]
         date_groups = split_messages_by_date(messages)
+        if not date_groups:
+            return  # ts가 있는 메시지가 없으면 쓸 파일도 없음 (기준점도 옮기지 않음)
+        granularity = self._file_granularity(conversation_dir, date_groups)
+        if granularity != "day":
+            date_groups = _regroup_by_period(date_groups, PERIOD_NAME_LEN[granularity])
+        files = []  # (경로, 바이트) - 대화 하나의 파일을 모아 한 번에 교체
+        appended = True  # jsonl: 모든 날짜 파일에 이어 쓰기 성공 여부
         for date_str, date_messages in date_groups.items():
+            if self.jsonl:
+                appended &= self._append_date_jsonl(conversation_dir, date_str, date_messages, merge)
+                continue
             date_file = conversation_dir / f"{date_str}.json"
+            if merge and date_file.exists():
+                date_messages = self._merge_date_file(date_file, date_messages)
+            files.append((date_file, _dumps(date_messages)))
+        if not files:
+            if appended and on_saved is not None:
+                on_saved()
+            return
+
+        if self._write_queue is not None:
+            # 디스크 쓰기는 기록 스레드에 맡기고 바로 다음 API 호출로 넘어감
+            self._write_queue.put((conversation_dir, files, on_saved))
+            return
+        try:
+            _atomic_write_many(conversation_dir, files)
+        except Exception as e:
+            print(f"[WARN] Failed to write files in {conversation_dir}: {e}", file=sys.stderr)
+            return
+        if on_saved is not None:
+            on_saved()
+
+    def _file_granularity(self, conversation_dir: pathlib.Path, date_groups: Dict[str, List[dict]]) -> str:
+        """이 대화의 메시지 파일 단위를 정합니다.
+
+        이미 저장된 파일이 있으면 그 단위를 그대로 따릅니다 (단위가 섞이면 같은 메시지가 두 파일에 들어가므로).
+        --file-granularity로 다른 단위를 지정했으면 경고만 하고 기존 단위를 사용합니다.
+        처음이고 auto이면 파일 하나의 평균 크기가 AUTO_GRANULARITY_MIN_BYTES 이상이 되도록 day → month → year 순으로 고릅니다.
+        """
+        existing = None
+        try:
+            with os.scandir(conversation_dir) as it:
+                for entry in it:
+                    if _DATE_FILE_RE.match(entry.name):
+                        stem_len = len(entry.name.split(".", 1)[0])
+                        existing = next(g for g, n in PERIOD_NAME_LEN.items() if n == stem_len)
+                        break
+        except FileNotFoundError:
+            pass
+        if existing is not None:
+            if self.file_granularity not in ("auto", existing):
+                print(f"[WARN] {conversation_dir.name}: keeping existing {existing} files instead of {self.file_granularity} "
+                      f"(delete the folder to change granularity)", file=sys.stderr)
+            return existing
+        if self.file_granularity != "auto":
+            return self.file_granularity
+
+        # 대화 전체를 한 번 더 직렬화하지 않도록 일부 메시지만 직렬화해 평균 크기로 전체 크기를 추정
+        messages = [m for msgs in date_groups.values() for m in msgs]
+        if not messages:
+            return "day"
+        sample = messages[::max(1, len(messages) // AUTO_GRANULARITY_SAMPLE)]
+        total_bytes = len(_dumps(sample, compact=True)) * len(messages) / len(sample)
+        for granularity in ("day", "month"):
+            name_len = PERIOD_NAME_LEN[granularity]
+            periods = {d[:name_len] for d in date_groups}
+            if total_bytes / len(periods) >= AUTO_GRANULARITY_MIN_BYTES:
+                return granularity
+        return "year"
+
+    def _append_date_jsonl(self, conversation_dir: pathlib.Path, date_str: str, messages: List[dict], merge: bool) -> bool:
+        """날짜별 JSONL 파일에 메시지를 한 줄씩 이어 씁니다.
+
+        {date}.idx에 저장된 ts 목록으로 이미 기록된 메시지는 건너뛰므로
+        기존 파일을 다시 읽거나 통째로 다시 쓰지 않습니다. merge가 False이면 새로 씁니다.
+        쓰기에 실패하면 False를 반환합니다.
+        """
+        date_file = conversation_dir / f"{date_str}.jsonl"
+        idx_file = conversation_dir / f"{date_str}.idx"
+        seen = set()
+        if merge and idx_file.exists():
             try:
-                with open(date_file, 'w', encoding='utf-8') as f:
-                    json.dump(date_messages, f, ensure_ascii=False, indent=2)
-            except Exception as e:
-                print(f"[WARN] Failed to write {date_file}: {e}", file=sys.stderr)
+                seen = set(idx_file.read_text(encoding='utf-8').split())
+            except OSError as e:
+                print(f"[WARN] Failed to read {idx_file}: {e}", file=sys.stderr)
+
+        new_messages = [m for m in messages if m.get("ts") not in seen]
+        if not new_messages:
+            return True
+        mode = 'ab' if merge else 'wb'
+        try:
+            with open(date_file, mode) as f:
+                f.writelines(_dumps(m, compact=True) + b'\n' for m in new_messages)
+            with open(idx_file, mode) as f:
+                f.writelines(f"{m.get('ts', '')}\n".encode('utf-8') for m in new_messages)
+        except OSError as e:
+            print(f"[WARN] Failed to write {date_file}: {e}", file=sys.stderr)
+            return False
+        return True
+
+    def _merge_date_file(self, date_file: pathlib.Path, new_messages: List[dict]) -> List[dict]:
+        """기존 날짜 파일의 메시지에 새 메시지를 ts 기준으로 덮어써 합치고 시간순으로 정렬합니다.
+
+        ts가 없는 기존 항목도 버리지 않고 맨 앞에 둡니다.
+        """
+        try:
+            existing = _loads(date_file.read_bytes())
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[WARN] Failed to load existing {date_file}: {e}", file=sys.stderr)
+            return new_messages
+
+        by_ts = {}
+        no_ts = []  # ts가 없는 항목은 합칠 기준이 없으므로 그대로 유지
+        for m in itertools.chain(existing, new_messages):
+            if m.get("ts"):
+                by_ts[m["ts"]] = m
+            else:
+                no_ts.append(m)
+        return sorted(itertools.chain(no_ts, by_ts.values()), key=_ts_key)
+
+    def _load_watermarks(self) -> Dict[str, float]:
+        """대화별로 마지막으로 저장한 메시지 ts를 읽어옵니다."""
+        path = self.cache_dir / WATERMARKS_FILE
+        try:
+            return _loads(path.read_bytes())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _scan_watermark(self, conversation_dir: pathlib.Path) -> Optional[float]:
+        """가장 최근 날짜 파일에서 마지막 메시지 ts를 찾습니다 (스레드 답글 제외).
+
+        watermark 기록이 없는 기존 백업을 처음 증분 백업할 때만 사용합니다.
+        """
+        date_files = [f for f in conversation_dir.iterdir() if _DATE_FILE_RE.match(f.name)]
+        if not date_files:
+            return None
+        newest = max(date_files, key=lambda f: f.name)
+        try:
+            if newest.suffix == '.jsonl':
+                data = [_loads(line) for line in newest.read_bytes().splitlines() if line.strip()]
+            else:
+                data = _loads(newest.read_bytes())
+            return _history_watermark(data)
+        except (json.JSONDecodeError, OSError, ValueError) as e:
+            print(f"[WARN] Failed to read {newest}: {e}", file=sys.stderr)
+            return None
 
     def _is_already_backed_up(self, conversation_dir: pathlib.Path) -> bool:
         """대화가 이미 백업되었는지 확인합니다.
 
-        폴더가 존재하고 .json 파일이 하나 이상 있으면 백업된 것으로 간주합니다.
+        폴더가 존재하고 .json 또는 .jsonl 파일이 하나 이상 있으면 백업된 것으로 간주합니다.
         """
-        if not conversation_dir.exists():
+        # 폴더 내에 .json/.jsonl 파일이 있는지 확인 (첫 항목을 찾으면 바로 중단)
+        try:
+            with os.scandir(conversation_dir) as it:
+                return any(entry.name.endswith(('.json', '.jsonl')) for entry in it)
+        except FileNotFoundError:
             return False
-        # 폴더 내에 .json 파일이 있는지 확인
-        json_files = list(conversation_dir.glob("*.json"))
-        return len(json_files) > 0
 
-    def _process_conversation(self, conv: dict, metadata_lists: dict) -> bool:
+    def _set_watermark(self, channel_id: str, ts: float):
+        """대화의 증분 백업 기준점을 기록합니다 (기록 스레드에서도 호출)."""
+        with self._watermarks_lock:
+            self._watermarks[channel_id] = ts
+
+    def _process_conversation(self, conv: dict) -> Tuple[Optional[dict], Optional[str], bool]:
         """하나의 대화를 처리합니다.
 
+        여러 스레드에서 동시에 호출되므로 공유 상태를 수정하지 않고 결과만 반환합니다.
+
+        이미 백업된 대화는 마지막으로 저장한 메시지 이후의 메시지만 가져와
+        기존 날짜 파일에 합칩니다 (force 옵션이면 처음부터 다시 백업).
+
         Returns:
-            bool: 대화가 처리되었으면 True, 스킵되었으면 False
+            tuple: (메타데이터, 메타데이터 목록 이름, 새 메시지가 있었는지 여부)
         """
         channel_id = conv["id"]
         label = self.conv_label(conv)
         conversation_dir = self.outdir / label
 
-        # 이미 백업된 대화인지 확인 (force 옵션이 없을 때만)
-        if not self.force and self._is_already_backed_up(conversation_dir):
-            return False  # 스킵됨
+        # 증분 백업 기준점 (force 옵션이 없을 때만)
+        last_ts = None
+        if not self.force:
+            last_ts = self._watermarks.get(channel_id)
+            if last_ts is None and self._is_already_backed_up(conversation_dir):
+                last_ts = self._scan_watermark(conversation_dir)
 
         conversation_dir.mkdir(parents=True, exist_ok=True)
 
         # 메시지 수집
-        messages = self._collect_messages(channel_id)
+        messages = self._collect_messages(channel_id, oldest=last_ts)
 
-        # 메타데이터 생성 및 분류
-        metadata = self._generate_metadata(conv, label)
-        self._classify_metadata(conv, metadata, metadata_lists)
+        # 메타데이터 생성 (새 메시지가 없으면 캐시된 멤버 목록 사용)
+        metadata = self._generate_metadata(conv, label, refresh_members=self.force or bool(messages))
 
-        # 메시지를 날짜별로 저장
-        self._save_messages_by_date(messages, conversation_dir)
-        return True  # 처리됨
+        # 메시지를 날짜별로 저장 (대화마다 폴더가 달라 잠금 불필요)
+        # 증분 백업 기준점은 파일이 실제로 기록된 뒤에만 옮김 (실패하면 다음 실행에서 다시 가져옴)
+        on_saved = None
+        newest = _history_watermark(messages)
+        if newest is not None:
+            watermark = max(newest, last_ts or 0)
+            on_saved = lambda: self._set_watermark(channel_id, watermark)
+        self._save_messages_by_date(messages, conversation_dir, merge=not self.force, on_saved=on_saved)
+        return metadata, self._metadata_type(conv), bool(messages)
 
     def _save_metadata(self, metadata_lists: dict):
-        """메타데이터를 병합하여 파일로 저장합니다."""
-        # 기존 메타데이터 로드
-        existing_metadata = {
-            "channels": self.load_existing_metadata("channels.json"),
-            "groups": self.load_existing_metadata("groups.json"),
-            "dms": self.load_existing_metadata("dms.json"),
-            "mpims": self.load_existing_metadata("mpims.json")
-        }
+        """메타데이터를 병합하여 파일로 저장합니다.
 
-        # 새로운 데이터와 기존 데이터 병합
-        merged_metadata = {}
+        한 번에 한 종류씩 기존 파일을 읽어 병합하고 바로 기록하므로
+        메모리에는 파일 하나 분량의 메타데이터만 올라갑니다.
+        기존 파일이 깨져 있으면 그 파일은 다시 쓰지 않습니다.
+        """
         for metadata_type in ["channels", "groups", "dms", "mpims"]:
-            merged_metadata[metadata_type] = self.merge_metadata(
-                existing_metadata[metadata_type],
-                metadata_lists[metadata_type]
-            )
-
-        # 병합된 메타데이터 파일 저장
-        for metadata_type, data in merged_metadata.items():
             file_path = self.outdir / f"{metadata_type}.json"
-            file_path.write_text(
-                json.dumps(data, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            existing = self.load_existing_metadata(file_path.name)
+            if existing is None:
+                # 기존 파일을 읽지 못했으면 일부 항목만으로 덮어써 잃어버리지 않도록 그대로 둠
+                print(f"[WARN] Skipping update of {file_path.name}; fix or remove it and run again", file=sys.stderr)
+                continue
+            # 기존 메타데이터와 새로운 데이터 병합
+            merged = self.merge_metadata(existing, metadata_lists[metadata_type])
+            _write_json_array(file_path, merged)
 
     def _get_conversations(self) -> List[dict]:
         """처리할 대화 목록을 가져옵니다."""
@@ -377,20 +966,52 @@ class SlackBackup:
             "mpims": []      # 다중대화(그룹DM)
         }
 
-        # 각 대화 처리
-        processed_count = 0
-        skipped_count = 0
-        for conv in tqdm(conversations, desc="Conversations"):
-            if self._process_conversation(conv, metadata_lists):
-                processed_count += 1
-            else:
-                skipped_count += 1
+        # 대화별 증분 백업 기준점 로드
+        self._watermarks = self._load_watermarks()
+
+        # 각 대화 처리 (네트워크 대기가 대부분이므로 스레드 풀로 동시 처리)
+        # 날짜 파일 쓰기는 별도 기록 스레드가 맡아 API 호출과 겹쳐서 진행
+        updated_count = 0
+        unchanged_count = 0
+        self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        writer = threading.Thread(target=_drain_write_queue, args=(self._write_queue,), daemon=True)
+        writer.start()
+        # 큰 채널 하나를 오래 처리하는 동안에도 진행 상황이 보이도록 메시지 수를 따로 표시
+        self._message_bar = tqdm(desc="Messages", unit=" msgs", position=1)
+        try:
+            # 대화 작업이 스레드 답글 풀에 작업을 넣으므로, 대화 풀이 먼저 끝난 뒤에 답글 풀을 닫도록
+            # 답글 풀을 바깥쪽에 둠 (with는 안쪽부터 닫음)
+            with ThreadPoolExecutor(max_workers=THREAD_FETCH_WORKERS) as self._thread_pool, \
+                    ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self._process_conversation, conv) for conv in conversations]
+                try:
+                    for future in tqdm(as_completed(futures), total=len(futures), desc="Conversations", position=0):
+                        metadata, metadata_type, updated = future.result()
+                        metadata_lists[metadata_type].append(metadata)
+                        if updated:
+                            updated_count += 1
+                        else:
+                            unchanged_count += 1
+                except BaseException:
+                    # 오류가 나면 아직 시작하지 않은 대화는 취소하고 실행 중인 대화만 마무리
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            # 남은 파일을 모두 쓴 뒤에 증분 백업 기준점을 저장
+            self._write_queue.put(None)
+            writer.join()
+            self._write_queue = None
+            self._thread_pool = None
+            self._message_bar.close()
+            self._message_bar = None
 
         # 결과 출력
-        print(f"\n백업 완료: {processed_count}개 처리, {skipped_count}개 스킵 (이미 백업됨)")
+        print(f"\n백업 완료: {updated_count}개 업데이트, {unchanged_count}개 새 메시지 없음")
 
-        # 메타데이터 저장
+        # 메타데이터 및 증분 백업 기준점 저장
         self._save_metadata(metadata_lists)
+        self._save_cache(WATERMARKS_FILE, self._watermarks)
 
 def parse_args():
     ap = argparse.ArgumentParser(description="Slack DM/Private backup via Web API")
@@ -399,7 +1020,14 @@ def parse_args():
     ap.add_argument("--conversation-id", default=None, help="Specific conversation ID to backup (channel/DM/group - if provided, only this conversation will be backed up)")
     ap.add_argument("--oldest", type=float, default=None, help="Oldest ts (float seconds). Omit for all")
     ap.add_argument("--latest", type=float, default=None, help="Latest ts (float seconds). Omit for now")
-    ap.add_argument("--force", action="store_true", help="Force re-backup even if already backed up")
+    ap.add_argument("--force", action="store_true", help="Re-fetch full history instead of only messages newer than the last backup")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Number of conversations to back up concurrently (default: {DEFAULT_WORKERS})")
+    ap.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL, help=f"Seconds to reuse cached user/conversation lists in <out>/{CACHE_DIRNAME} (default: {DEFAULT_CACHE_TTL}, 0 disables)")
+    ap.add_argument("--jsonl", action="store_true", help="Append messages to per-date .jsonl files instead of rewriting .json files (convert with convert_jsonl_to_json.py)")
+    ap.add_argument("--file-granularity", choices=FILE_GRANULARITIES, default="day", help="Period covered by each message file: day (YYYY-MM-DD.json), month (YYYY-MM.json), year (YYYY.json), or auto to pick by conversation volume; conversations already backed up keep their existing granularity (default: day)")
+    ap.add_argument("--slim", action="store_true", help="Keep only core message fields (ts, user, text, thread, files, reactions, edited) and drop blocks, bot_profile, etc.")
+    ap.add_argument("--include-members", action="store_true", help="Also fetch member lists for public channels (always fetched for DMs, group DMs and private channels)")
+    ap.add_argument("--refresh-cache", action="store_true", help="Ignore cached user/conversation lists and fetch them again")
     return ap.parse_args()
 
 if __name__ == "__main__":
@@ -415,7 +1043,14 @@ if __name__ == "__main__":
         conversation_id=getattr(args, 'conversation_id', None),
         oldest=args.oldest,
         latest=args.latest,
-        force=args.force
+        force=args.force,
+        workers=args.workers,
+        cache_ttl=args.cache_ttl,
+        refresh_cache=args.refresh_cache,
+        jsonl=args.jsonl,
+        include_members=args.include_members,
+        file_granularity=args.file_granularity,
+        slim=args.slim
     )
     backup.run()
 
@@ -1,43 +1,147 @@
 #!/usr/bin/env python3
+import functools
+import itertools
+import operator
 import os
 import json
 import pathlib
-from datetime import datetime, timezone
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, Iterable, List
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def timestamp_to_date(ts: str) -> str:
-    """타임스탬프를 UTC 날짜(YYYY-MM-DD)로 변환"""
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 모듈로 대체
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson이 없으면 표준 json 모듈로 통째로 읽음
+    ijson = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 --zstd 옵션을 쓸 수 없음
+    zstandard = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 날짜 분할을 순수 파이썬으로 처리
+    np = None
+
+NUMPY_SPLIT_THRESHOLD = 10_000  # 이보다 메시지가 많으면 numpy로 날짜 계산 (설치된 경우)
+ZSTD_LEVEL = 3  # 압축률보다 속도를 우선하는 zstd 레벨
+
+def _loads(data: bytes):
+    """JSON 바이트열을 파싱합니다 (orjson 우선, 없으면 표준 json)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _dumps(obj, compact: bool = False) -> bytes:
+    """객체를 UTF-8 JSON 바이트열로 직렬화합니다 (기본: 2칸 들여쓰기, compact면 공백 없이)."""
+    if orjson is not None:
+        if compact:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+def _iter_files(root, name_pred, recursive: bool = True):
+    """os.scandir로 디렉토리를 순회하며 name_pred를 만족하는 파일 경로를 yield 합니다."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif name_pred(entry.name):
+                    yield entry.path
+
+@functools.lru_cache(maxsize=None)
+def _day_str(days: int) -> str:
+    """1970-01-01부터의 일 수를 YYYY-MM-DD 문자열로 변환 (날짜마다 한 번만 계산)
+
+    date 객체를 만들지 않고 정수 연산만으로 그레고리력 날짜를 구합니다
+    (Howard Hinnant의 civil_from_days 알고리즘).
+    """
+    z = days + 719468  # 0000-03-01 기준 일 수
+    era = z // 146097  # 400년 주기
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153  # 3월을 0으로 하는 월
+    d = doy - (153 * mp + 2) // 5 + 1
+    m = mp + 3 if mp < 10 else mp - 9
+    y = yoe + era * 400 + (m <= 2)
+    return f"{y:04d}-{m:02d}-{d:02d}"
+
+def timestamp_to_date(ts) -> str:
+    """타임스탬프(문자열 또는 float)를 UTC 날짜(YYYY-MM-DD)로 변환"""
     try:
         # Slack timestamp는 Unix timestamp (초 단위, 소수점 포함)
-        timestamp = float(ts)
-        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-        return dt.strftime('%Y-%m-%d')
-    except (ValueError, TypeError):
+        # UTC 날짜는 하루(86400초) 단위 정수 나눗셈으로 바로 구함
+        return _day_str(int(float(ts) // 86400))
+    except (ValueError, TypeError, OverflowError):
         print(f"Warning: Invalid timestamp {ts}")
         return "unknown-date"
 
-def split_messages_by_date(messages: List[dict]) -> Dict[str, List[dict]]:
-    """메시지를 날짜별로 그룹화"""
-    date_groups = defaultdict(list)
+def _dates_numpy(stamps: List[float]) -> List[str]:
+    """float 타임스탬프 목록을 numpy로 한 번에 UTC 날짜(YYYY-MM-DD) 목록으로 변환"""
+    days = np.floor(np.asarray(stamps, dtype=np.float64) / 86400).astype(np.int64)
+    # 고유한 날짜만 문자열로 만들고 나머지는 인덱스로 참조
+    uniq, inverse = np.unique(days, return_inverse=True)
+    labels = [str(d) for d in uniq.astype('datetime64[D]')]
+    return [labels[i] for i in inverse.tolist()]
+
+def split_messages_by_date(messages: Iterable[dict]) -> Dict[str, List[dict]]:
+    """메시지를 날짜별로 그룹화 (messages는 한 번만 순회하므로 스트리밍 이터레이터도 가능)"""
+    date_groups = defaultdict(list)  # 날짜 -> [(float ts, 메시지)]
 
+    # ts 문자열은 한 번만 float로 변환해 날짜 계산과 정렬에 같이 사용
+    pairs = []
+    append = pairs.append
     for msg in messages:
         ts = msg.get("ts")
         if not ts:
             continue
+        try:
+            append((float(ts), msg))
+        except (ValueError, TypeError):
+            print(f"Warning: Invalid timestamp {ts}")
+            date_groups["unknown-date"].append((0.0, msg))
+
+    # 메시지가 아주 많은 채널은 numpy로 날짜를 한꺼번에 계산
+    if np is not None and len(pairs) > NUMPY_SPLIT_THRESHOLD:
+        dates = _dates_numpy([ts_f for ts_f, _ in pairs])
+    else:
+        # 메시지마다 전역 이름을 찾지 않도록 지역 변수로 묶어 둠
+        to_date = timestamp_to_date
+        dates = [to_date(ts_f) for ts_f, _ in pairs]
+    for date_str, pair in zip(dates, pairs):
+        date_groups[date_str].append(pair)
 
-        date_str = timestamp_to_date(ts)
-        date_groups[date_str].append(msg)
+    # 입력이 이미 시간순이면 (스레드 답글이 없는 채널 등) 날짜 그룹도 시간순이므로 정렬 생략
+    # main.py는 스레드 답글을 부모 바로 뒤에 끼워 넣으므로 항상 정렬돼 있다고 가정할 수는 없음
+    already_sorted = all(a[0] <= b[0] for a, b in zip(pairs, itertools.islice(pairs, 1, None)))
 
     # 각 날짜 그룹 내에서 시간순 정렬
-    for date_str in date_groups:
-        date_groups[date_str].sort(key=lambda x: float(x.get("ts", "0")))
+    result = {}
+    for date_str, pairs in date_groups.items():
+        if not already_sorted:
+            pairs.sort(key=operator.itemgetter(0))
+        result[date_str] = [msg for _, msg in pairs]
 
-    return dict(date_groups)
+    return result
 
-def process_channel(channel_dir: pathlib.Path):
-    """개별 채널 폴더의 messages.json을 날짜별로 분할"""
+def process_channel(channel_dir: pathlib.Path, jsonl: bool = False, compress: bool = False):
+    """개별 채널 폴더의 messages.json을 날짜별로 분할
+
+    jsonl이면 한 줄에 메시지 하나씩 .jsonl로, compress면 zstd로 압축해 .zst를 붙여 저장합니다.
+    """
     messages_file = channel_dir / "messages.json"
 
     if not messages_file.exists():
@@ -46,21 +150,19 @@ def process_channel(channel_dir: pathlib.Path):
 
     print(f"Processing {channel_dir.name}...")
 
-    # messages.json 읽기
+    # messages.json 읽기 + 날짜별로 분할
     try:
-        with open(messages_file, 'r', encoding='utf-8') as f:
-            messages = json.load(f)
+        # 메시지는 어차피 날짜별로 모두 모아 두므로 orjson으로 한 번에 읽는 쪽이 훨씬 빠름
+        # orjson이 없을 때만 ijson으로 읽어 표준 json이 만드는 파일 전체 문자열 사본을 피함
+        if orjson is None and ijson is not None:
+            with open(messages_file, 'rb') as f:
+                date_groups = split_messages_by_date(ijson.items(f, 'item', use_float=True))
+        else:
+            date_groups = split_messages_by_date(_loads(messages_file.read_bytes()))
     except Exception as e:
         print(f"Error reading {messages_file}: {e}")
         return
 
-    if not messages:
-        print(f"  No messages found in {channel_dir.name}")
-        return
-
-    # 날짜별로 분할
-    date_groups = split_messages_by_date(messages)
-
     if not date_groups:
         print(f"  No valid messages with timestamps in {channel_dir.name}")
         return
@@ -69,11 +171,21 @@ def process_channel(channel_dir: pathlib.Path):
     dates_dir = channel_dir / "dates"
     dates_dir.mkdir(exist_ok=True)
 
+    suffix = ".jsonl" if jsonl else ".json"
+    compressor = None
+    if compress:
+        suffix += ".zst"
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
     for date_str, date_messages in date_groups.items():
-        date_file = dates_dir / f"{date_str}.json"
+        date_file = dates_dir / f"{date_str}{suffix}"
         try:
-            with open(date_file, 'w', encoding='utf-8') as f:
-                json.dump(date_messages, f, ensure_ascii=False, indent=2)
+            if jsonl:
+                data = b"".join(_dumps(m, compact=True) + b"\n" for m in date_messages)
+            else:
+                data = _dumps(date_messages)
+            if compressor is not None:
+                data = compressor.compress(data)
+            date_file.write_bytes(data)
             print(f"  Saved {len(date_messages)} messages to {date_file.name}")
         except Exception as e:
             print(f"Error writing {date_file}: {e}")
@@ -82,23 +194,31 @@ def process_channel(channel_dir: pathlib.Path):
 
 def find_channel_dirs(backup_root: pathlib.Path) -> List[pathlib.Path]:
     """백업 폴더에서 채널 디렉토리들을 찾기"""
-    channel_dirs = []
-
-    for item in backup_root.iterdir():
-        if item.is_dir() and (item / "messages.json").exists():
-            channel_dirs.append(item)
-
-    return channel_dirs
+    # DirEntry.is_dir()는 디렉토리 목록을 읽을 때 받은 정보를 쓰므로 항목마다 stat을 하지 않음
+    with os.scandir(backup_root) as it:
+        return [pathlib.Path(entry.path) for entry in it
+                if entry.is_dir()
+                and os.path.isfile(os.path.join(entry.path, "messages.json"))]
 
 def main():
     parser = argparse.ArgumentParser(description="Split Slack messages.json files by date")
     parser.add_argument("backup_dir", help="Backup directory containing channel folders")
     parser.add_argument("--channel", help="Specific channel directory name to process (optional)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of channels to process in parallel (default: CPU count)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Write per-date .jsonl files (one message per line) instead of indented .json")
+    parser.add_argument("--zstd", action="store_true",
+                        help="Compress per-date files with zstd (adds .zst; requires the zstandard package)")
 
     args = parser.parse_args()
 
     backup_root = pathlib.Path(args.backup_dir)
 
+    if args.zstd and zstandard is None:
+        print("Error: --zstd requires the zstandard package (pip install zstandard)")
+        return
+
     if not backup_root.exists():
         print(f"Error: Backup directory {backup_root} does not exist")
         return
@@ -109,7 +229,7 @@ def main():
         if not channel_dir.exists():
             print(f"Error: Channel directory {channel_dir} does not exist")
             return
-        process_channel(channel_dir)
+        process_channel(channel_dir, jsonl=args.jsonl, compress=args.zstd)
     else:
         # 모든 채널 처리
         channel_dirs = find_channel_dirs(backup_root)
@@ -120,8 +240,16 @@ def main():
 
         print(f"Found {len(channel_dirs)} channel directories")
 
-        for channel_dir in channel_dirs:
-            process_channel(channel_dir)
+        # 채널끼리는 서로 독립적이고 JSON 파싱/직렬화가 CPU 위주이므로 프로세스로 나눠 처리
+        workers = min(max(1, args.workers), len(channel_dirs))
+        process = functools.partial(process_channel, jsonl=args.jsonl, compress=args.zstd)
+        if workers == 1:
+            for channel_dir in channel_dirs:
+                process(channel_dir)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(process, channel_dirs):
+                    pass
 
     print("Date splitting completed!")
 